@@ -3,12 +3,16 @@ from flask_sqlalchemy import SQLAlchemy
 from app.models.models import db
 from datetime import datetime
 from flasgger import Swagger
+from app.config import profile_config, init_sqlite
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key'
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quiz_master.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(profile_config())
+    if config:
+        app.config.update(config)
 
     app.config['SWAGGER'] = {
         'title': 'Quiz Master API',
@@ -32,6 +36,13 @@ def create_app():
     }
     
     db.init_app(app)
+    init_sqlite(app)
+
+    from app.cache import init_cache
+    init_cache(app)
+
+    from app.submissions import init_submissions
+    init_submissions(app)
     @app.context_processor
     def utility_processor():
         def now():
@@ -48,6 +59,12 @@ def create_app():
     from app.routes.user import user
     app.register_blueprint(user, url_prefix='/user')
 
+    from app.routes.batch import batch
+    app.register_blueprint(batch, url_prefix='/api')
+
+    from app.commands import register_commands
+    register_commands(app)
+
     swagger = Swagger(app)
     
     return app 
\ No newline at end of file
@@ -0,0 +1,158 @@
+from sqlalchemy import Integer, delete, func, select
+from app.models.models import db, Chapter, Quiz, Question, Score, Response
+
+# Item analysis. Answers are kept either as Response rows (RESPONSE_STORAGE = 'rows') or packed into
+# Score.answers (RESPONSE_STORAGE = 'packed'); the helpers below read both, so switching modes keeps history.
+#
+# Row queries filter and group on (question_id, is_correct), which ix_response_question_correct covers,
+# so SQLite answers them from the index alone.
+#
+# A packed blob holds 3 bits per question in answer key order (question id order), least significant
+# bits first: 0 for unanswered, otherwise the selected option. It is only meaningful against the answer
+# key it was graded with, so Score.answers_version records the quiz's questions_version at submit time
+# and blobs from before a later question change are ignored.
+
+BITS_PER_ANSWER = 3
+ANSWER_MASK = (1 << BITS_PER_ANSWER) - 1
+# Lanes of the vectorized scan's running totals, wide enough for any realistic number of attempts
+COUNTER_BITS = 24
+
+def pack_answers(answer_key, question_results):
+    """Pack grade_answers() question_results into bytes, one 3-bit field per answer key entry"""
+    selected = {result['id']: result['user_answer'] for result in question_results}
+    packed = 0
+    for position, (question_id, _) in enumerate(answer_key):
+        option = selected.get(question_id)
+        if option is None:
+            continue
+        # Options outside 1-7 cannot be represented; they were wrong anyway, so keep them as answered
+        if not 1 <= option <= ANSWER_MASK:
+            option = ANSWER_MASK
+        packed |= option << (position * BITS_PER_ANSWER)
+    return packed.to_bytes((len(answer_key) * BITS_PER_ANSWER + 7) // 8, 'little')
+
+def unpack_answers(blob, count):
+    """Return the selected option (0 for unanswered) of each of the first count questions in a packed blob"""
+    packed = int.from_bytes(blob, 'little')
+    return [(packed >> (position * BITS_PER_ANSWER)) & ANSWER_MASK for position in range(count)]
+
+def _lanes(values):
+    """Spread small integers into consecutive 3-bit fields of one integer"""
+    packed = 0
+    for position, value in enumerate(values):
+        packed |= value << (position * BITS_PER_ANSWER)
+    return packed
+
+def decode_attempt(score, quiz, answer_key):
+    """
+    Return {question_id: (selected_option, is_correct)} from a Score's packed answers, or None when
+    it has none or they were graded against an older version of the quiz's questions
+    """
+    if score.answers is None or score.answers_version != quiz.questions_version:
+        return None
+    answers = unpack_answers(score.answers, len(answer_key))
+    return {
+        question_id: (selected, selected == correct_option)
+        for (question_id, correct_option), selected in zip(answer_key, answers)
+        if selected
+    }
+
+def attempt_responses(score_id):
+    """Return {question_id: (selected_option, is_correct)} for one attempt's Response rows"""
+    query = db.session.query(Response.question_id, Response.selected_option, Response.is_correct)
+    return {question_id: (selected, correct) for question_id, selected, correct in query.filter_by(score_id=score_id)}
+
+def attempt_answers(score, quiz, answer_key):
+    """Return {question_id: (selected_option, is_correct)} for one attempt, whichever way it was stored"""
+    decoded = decode_attempt(score, quiz, answer_key)
+    if decoded is not None:
+        return decoded
+    return attempt_responses(score.id)
+
+def packed_correctness(quiz, answer_key):
+    """
+    Return {question_id: (responses, correct)} from the packed answers of every attempt at the quiz.
+    Each blob is compared with the whole answer key at once using integer bit operations: a field is
+    answered when any of its bits is set and correct when it also equals the key's field. The per-field
+    flags are summed as integers, 7 attempts at a time so a 3-bit field cannot overflow, then moved into
+    COUNTER_BITS-wide lanes.
+    """
+    count = len(answer_key)
+    if not count:
+        return {}
+    key = _lanes(correct_option for _, correct_option in answer_key)
+    low_bits = _lanes([1] * count)
+    # Every 8th field lines up with a COUNTER_BITS lane after shifting by 3 * residue
+    groups = COUNTER_BITS // BITS_PER_ANSWER
+    spread = sum(ANSWER_MASK << (lane * COUNTER_BITS) for lane in range((count + groups - 1) // groups))
+
+    answered_totals = [0] * groups
+    correct_totals = [0] * groups
+    answered_batch = correct_batch = batched = 0
+
+    def flush():
+        for residue in range(groups):
+            shift = residue * BITS_PER_ANSWER
+            answered_totals[residue] += (answered_batch >> shift) & spread
+            correct_totals[residue] += (correct_batch >> shift) & spread
+
+    query = db.session.query(Score.answers).filter(Score.quiz_id == quiz.id,
+                                                   Score.answers_version == quiz.questions_version)
+    for (blob,) in query.filter(Score.answers.isnot(None)):
+        packed = int.from_bytes(blob, 'little')
+        answered = (packed | packed >> 1 | packed >> 2) & low_bits
+        differs = packed ^ key
+        wrong = (differs | differs >> 1 | differs >> 2) & low_bits
+        answered_batch += answered
+        correct_batch += answered & (low_bits ^ wrong)
+        batched += 1
+        if batched == ANSWER_MASK:
+            flush()
+            answered_batch = correct_batch = batched = 0
+    flush()
+
+    counts = {}
+    counter_mask = (1 << COUNTER_BITS) - 1
+    for position, (question_id, _) in enumerate(answer_key):
+        lane_shift = (position // groups) * COUNTER_BITS
+        responses = (answered_totals[position % groups] >> lane_shift) & counter_mask
+        if responses:
+            counts[question_id] = (responses, (correct_totals[position % groups] >> lane_shift) & counter_mask)
+    return counts
+
+def row_correctness(quiz_id):
+    """Return {question_id: (responses, correct)} from the Response rows of the quiz's questions"""
+    question_ids = db.session.query(Question.id).filter_by(quiz_id=quiz_id)
+    # An untyped sum would come back as a Boolean like the column it adds up
+    query = db.session.query(Response.question_id, func.count(), func.sum(Response.is_correct, type_=Integer))
+    query = query.filter(Response.question_id.in_(question_ids.scalar_subquery())).group_by(Response.question_id)
+    return {question_id: (responses, correct or 0) for question_id, responses, correct in query}
+
+def question_correctness(quiz, answer_key):
+    """Return {question_id: (responses, correct)} for the quiz's answered questions across both storage modes"""
+    counts = row_correctness(quiz.id)
+    for question_id, (responses, correct) in packed_correctness(quiz, answer_key).items():
+        row_responses, row_correct = counts.get(question_id, (0, 0))
+        counts[question_id] = (row_responses + responses, row_correct + correct)
+    return counts
+
+def correctness_rate(counts, question_id):
+    """The {'responses', 'correct', 'correct_rate'} entry for a question from question_correctness() counts"""
+    responses, correct = counts.get(question_id, (0, 0))
+    return {
+        'responses': responses,
+        'correct': correct,
+        'correct_rate': round(correct / responses * 100, 1) if responses else None
+    }
+
+def delete_responses(*criteria):
+    """
+    Bulk-delete the Response rows of the questions matching criteria on Question, Quiz or Chapter,
+    e.g. delete_responses(Quiz.chapter_id == 3), before deleting those questions or their parents.
+    Score.responses and Question.responses are passive, so the ORM cascade no longer loads and deletes
+    each attempt's rows one parent at a time; call this in the same transaction instead.
+    """
+    question_ids = select(Question.id).join(Quiz, Question.quiz_id == Quiz.id)
+    question_ids = question_ids.join(Chapter, Quiz.chapter_id == Chapter.id).where(*criteria)
+    statement = delete(Response).where(Response.question_id.in_(question_ids))
+    db.session.execute(statement, execution_options={'synchronize_session': False})
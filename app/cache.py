@@ -0,0 +1,188 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from flask import current_app, render_template
+from markupsafe import Markup
+from app.models.models import db, User, Subject, Chapter, Quiz, Question
+from app.utils import adjust_count, serialize_question, serialize_subjects
+from app.catalog import CatalogCache
+
+QUESTION_FIELDS = ('id', 'question_statement', 'option1', 'option2', 'option3', 'option4', 'correct_option')
+
+# One build lock per quiz, so a slow build never holds up misses on other quizzes. A lock lives
+# only while some thread holds a reference to it, so the mapping does not grow with the catalog.
+_payload_build_locks = weakref.WeakValueDictionary()
+_payload_build_locks_guard = threading.Lock()
+
+def _payload_build_lock(quiz_id):
+    with _payload_build_locks_guard:
+        lock = _payload_build_locks.get(quiz_id)
+        if lock is None:
+            lock = _payload_build_locks[quiz_id] = threading.Lock()
+        return lock
+
+class LRUCache:
+    """Thread-safe mapping that drops the least recently used entry beyond maxsize"""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class DashboardStats:
+    """
+    Admin dashboard counts and recent subjects. The routes that add or delete rows adjust the counts
+    in place; everything is reloaded after ttl seconds to pick up writes made by other processes.
+    A write reads generation() before it commits and passes it to adjust(), so counts reloaded in
+    between, which may already include the write, are dropped rather than adjusted a second time.
+    """
+    COUNTED = {'users': User, 'subjects': Subject, 'chapters': Chapter, 'quizzes': Quiz}
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts = None
+        self._counts_loaded_at = 0
+        self._generation = 0
+        self._recent_subjects = None
+        self._recent_loaded_at = 0
+
+    def counts(self):
+        with self._lock:
+            if self._counts is None or time.monotonic() - self._counts_loaded_at > self.ttl:
+                self._counts = {name: model.query.count() for name, model in self.COUNTED.items()}
+                self._counts_loaded_at = time.monotonic()
+                self._generation += 1
+            return dict(self._counts)
+
+    def generation(self):
+        """The load generation of the counts; read it before committing the write passed to adjust()"""
+        with self._lock:
+            return self._generation
+
+    def recent_subjects(self, limit=5):
+        """Serialized newest subjects"""
+        with self._lock:
+            if self._recent_subjects is None or time.monotonic() - self._recent_loaded_at > self.ttl:
+                subjects = Subject.query.order_by(Subject.created_at.desc()).limit(limit).all()
+                self._recent_subjects = serialize_subjects(subjects)
+                self._recent_loaded_at = time.monotonic()
+            return list(self._recent_subjects)
+
+    def adjust(self, generation, **deltas):
+        """Apply committed row count changes, e.g. adjust(generation, chapters=-3, quizzes=-9)"""
+        with self._lock:
+            if self._counts is None:
+                return
+            if generation != self._generation:
+                self._counts = None
+                return
+            for name, delta in deltas.items():
+                self._counts[name] += delta
+
+    def forget_recent_subjects(self):
+        with self._lock:
+            self._recent_subjects = None
+
+def dashboard_stats():
+    return current_app.extensions['dashboard_stats']
+
+def init_cache(app):
+    """Create the per-application caches"""
+    app.config.setdefault('ANSWER_KEY_CACHE_SIZE', 1024)
+    app.config.setdefault('QUESTION_PAYLOAD_CACHE_SIZE', 256)
+    app.config.setdefault('DASHBOARD_STATS_TTL', 60)
+    app.config.setdefault('CATALOG_SNAPSHOT_TTL', 30)
+    app.extensions['answer_keys'] = LRUCache(app.config['ANSWER_KEY_CACHE_SIZE'])
+    app.extensions['question_payloads'] = LRUCache(app.config['QUESTION_PAYLOAD_CACHE_SIZE'])
+    app.extensions['dashboard_stats'] = DashboardStats(app.config['DASHBOARD_STATS_TTL'])
+    app.extensions['catalog'] = CatalogCache(app.config['CATALOG_SNAPSHOT_TTL'])
+
+def get_answer_key(quiz):
+    """
+    Return the quiz's answer key as a tuple of (question_id, correct_option) pairs in question order.
+    Entries are tagged with quiz.questions_version, so a key cached before an edit made by any
+    process is reloaded instead of used.
+    """
+    cache = current_app.extensions['answer_keys']
+    cached = cache.get(quiz.id)
+    if cached and cached[0] == quiz.questions_version:
+        return cached[1]
+
+    query = db.session.query(Question.id, Question.correct_option).filter_by(quiz_id=quiz.id)
+    answer_key = tuple((question_id, correct_option) for question_id, correct_option in query.order_by(Question.id))
+    cache.set(quiz.id, (quiz.questions_version, answer_key))
+    return answer_key
+
+class QuestionPayload:
+    """A quiz's questions prepared once per questions_version and shared by every request"""
+    def __init__(self, version, questions, json, html):
+        self.version = version
+        # Plain dicts with the Question columns, usable wherever templates expect Question objects
+        self.questions = questions
+        # UTF-8 JSON array of serialize_question() output, without correct answers
+        self.json = json
+        # Rendered user/quizzes/question_block.html
+        self.html = html
+
+def get_question_payload(quiz):
+    """Return the cached QuestionPayload for a quiz, building it on first use or after a question change"""
+    cache = current_app.extensions['question_payloads']
+    payload = cache.get(quiz.id)
+    if payload and payload.version == quiz.questions_version:
+        return payload
+
+    # Requests that miss the same quiz together wait for one build instead of each querying and rendering
+    with _payload_build_lock(quiz.id):
+        payload = cache.get(quiz.id)
+        if payload and payload.version == quiz.questions_version:
+            return payload
+
+        rows = Question.query.filter_by(quiz_id=quiz.id).order_by(Question.id).all()
+        questions = tuple({field: getattr(row, field) for field in QUESTION_FIELDS} for row in rows)
+        json = current_app.json.dumps([serialize_question(row) for row in rows]).encode()
+        html = Markup(render_template('user/quizzes/question_block.html', questions=questions))
+        payload = QuestionPayload(quiz.questions_version, questions, json, html)
+        cache.set(quiz.id, payload)
+        return payload
+
+def questions_response(envelope, payload):
+    """Return envelope as a JSON response with the payload's pre-serialized list spliced in as 'questions'"""
+    body = current_app.json.dumps(envelope).encode()
+    body = body[:-1] + b', "questions": ' + payload.json + b'}'
+    return current_app.response_class(body, mimetype='application/json')
+
+def questions_changed(quiz_id):
+    """Bump the quiz's questions_version and drop its cached entries; call before committing a question write"""
+    adjust_count(Quiz.questions_version, quiz_id, 1)
+    forget_quiz(quiz_id)
+
+def forget_quiz(quiz_id):
+    """Drop everything cached for a quiz in this process"""
+    current_app.extensions['answer_keys'].pop(quiz_id)
+    current_app.extensions['question_payloads'].pop(quiz_id)
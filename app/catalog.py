@@ -0,0 +1,141 @@
+import threading
+import time
+from flask import current_app
+from app.models.models import db, Subject, Chapter, Quiz
+from app.utils import catalog_version
+
+# Read-only, process-local copy of the Subject -> Chapter -> Quiz tree for the user browse routes.
+# Records mirror the model columns the serializers read and link to their parent and children,
+# so serialize_subjects/serialize_chapters/serialize_quizzes(prefetch=False) accept them as-is.
+
+class SubjectRecord:
+    __slots__ = ('id', 'name', 'description', 'created_at', 'updated_at', 'chapters_count', 'chapters')
+
+class ChapterRecord:
+    __slots__ = ('id', 'name', 'description', 'subject_id', 'created_at', 'updated_at', 'quizzes_count',
+                 'subject', 'quizzes')
+
+class QuizRecord:
+    __slots__ = ('id', 'chapter_id', 'title', 'date_of_quiz', 'time_duration', 'remarks', 'created_at',
+                 'updated_at', 'questions_count', 'chapter')
+
+    is_available = Quiz.is_available
+    get_availability_window = Quiz.get_availability_window
+
+def _load(record_class, model):
+    """Read every row of model into records, keyed by id in id order"""
+    columns = [getattr(model, name) for name in record_class.__slots__ if name in model.__table__.columns]
+    records = {}
+    for row in db.session.query(*columns).order_by(model.id):
+        record = record_class()
+        for column, value in zip(columns, row):
+            setattr(record, column.key, value)
+        records[record.id] = record
+    return records
+
+class CatalogSnapshot:
+    """An immutable catalog: id indexes for each level plus parent links and child tuples on the records"""
+    __slots__ = ('version', 'subjects', 'chapters', 'quizzes')
+
+    def __init__(self):
+        # Taken before the rows are read, so changes made during the build show up as a new version
+        self.version = catalog_version(Subject, Chapter, Quiz)
+        self.subjects = _load(SubjectRecord, Subject)
+        self.chapters = _load(ChapterRecord, Chapter)
+        self.quizzes = _load(QuizRecord, Quiz)
+
+        chapters_by_subject = {subject_id: [] for subject_id in self.subjects}
+        for chapter in self.chapters.values():
+            chapter.subject = self.subjects.get(chapter.subject_id)
+            chapters_by_subject.setdefault(chapter.subject_id, []).append(chapter)
+
+        quizzes_by_chapter = {chapter_id: [] for chapter_id in self.chapters}
+        for quiz in self.quizzes.values():
+            quiz.chapter = self.chapters.get(quiz.chapter_id)
+            quizzes_by_chapter.setdefault(quiz.chapter_id, []).append(quiz)
+
+        for subject in self.subjects.values():
+            subject.chapters = tuple(chapters_by_subject[subject.id])
+        for chapter in self.chapters.values():
+            chapter.quizzes = tuple(quizzes_by_chapter[chapter.id])
+
+class CatalogCache:
+    """
+    Holds the current CatalogSnapshot. Admin writes in this process call invalidate() after committing
+    and the next reader builds a replacement; writes made by other processes are noticed by comparing
+    catalog_version() at most once every ttl seconds. Readers never see a partly built snapshot.
+    """
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._snapshot = None
+        self._checked_at = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at <= self.ttl:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or catalog_version(Subject, Chapter, Quiz) != snapshot.version:
+                generation = self._generation
+                snapshot = CatalogSnapshot()
+                # An invalidate() during the build means the rows read may predate that write
+                if generation == self._generation:
+                    self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        self._generation += 1
+        self._snapshot = None
+
+def catalog():
+    """The current catalog snapshot"""
+    return current_app.extensions['catalog'].get()
+
+def catalog_changed():
+    """Drop this process's snapshot; call after committing a Subject, Chapter, Quiz or Question change"""
+    current_app.extensions['catalog'].invalidate()
+
+def quiz_node(quiz, attempted):
+    return {
+        'id': quiz.id,
+        'title': quiz.title,
+        'date_of_quiz': quiz.date_of_quiz.isoformat() if quiz.date_of_quiz else None,
+        'time_duration': quiz.time_duration,
+        'questions_count': quiz.questions_count,
+        'is_available': quiz.is_available(),
+        'attempted': quiz.id in attempted
+    }
+
+def chapter_node(chapter, depth, attempted):
+    """A chapter with attempt counts and, when depth > 1, its quizzes"""
+    node = {
+        'id': chapter.id,
+        'name': chapter.name,
+        'description': chapter.description,
+        'subject_id': chapter.subject_id,
+        'quizzes_count': len(chapter.quizzes),
+        'attempted_count': sum(1 for quiz in chapter.quizzes if quiz.id in attempted)
+    }
+    if depth > 1:
+        node['quizzes'] = [quiz_node(quiz, attempted) for quiz in chapter.quizzes]
+    return node
+
+def subject_node(subject, depth, attempted):
+    """A subject with chapter, quiz and attempt counts and, when depth > 1, its chapters"""
+    chapters = [chapter_node(chapter, depth - 1, attempted) for chapter in subject.chapters]
+    node = {
+        'id': subject.id,
+        'name': subject.name,
+        'description': subject.description,
+        'chapters_count': len(subject.chapters),
+        'quizzes_count': sum(chapter['quizzes_count'] for chapter in chapters),
+        'attempted_count': sum(chapter['attempted_count'] for chapter in chapters)
+    }
+    if depth > 1:
+        node['chapters'] = chapters
+    return node
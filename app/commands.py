@@ -0,0 +1,25 @@
+import click
+from app.utils import repair_counts
+from app.search import rebuild_search_index
+from app.stats import rebuild_quiz_stats
+
+def register_commands(app):
+    """Register the maintenance commands available through the flask CLI"""
+
+    @app.cli.command('repair-counts')
+    def repair_counts_command():
+        """Recompute the chapter, quiz and question counter columns."""
+        repair_counts()
+        click.echo('Counters repaired.')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the full-text search tables from the catalog and user tables."""
+        rebuild_search_index()
+        click.echo('Search index rebuilt.')
+
+    @app.cli.command('rebuild-quiz-stats')
+    def rebuild_quiz_stats_command():
+        """Recompute the per-quiz attempt statistics from the scores table."""
+        quizzes = rebuild_quiz_stats()
+        click.echo(f'Statistics rebuilt for {quizzes} quizzes.')
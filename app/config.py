@@ -0,0 +1,85 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Configuration profiles. create_app() applies the profile named by QUIZ_MASTER_CONFIG
+# ("production"); without it the development defaults in create_app() are used unchanged.
+
+def _env_int(environ, name, default):
+    return int(environ.get(name, default))
+
+def _env_bool(environ, name, default):
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _uses_queue_pool(database_uri):
+    """False for in-memory SQLite, which Flask-SQLAlchemy gives a StaticPool with no size options"""
+    url = make_url(database_uri)
+    if url.get_backend_name() != 'sqlite':
+        return True
+    return url.database not in (None, '', ':memory:') and url.query.get('mode') != 'memory'
+
+def production_config(environ=os.environ):
+    """
+    Settings for a multi-threaded production server, read from the environment.
+    SQLite runs in WAL mode so readers no longer block the writer, and commits skip the fsync of
+    synchronous=FULL (a power loss can drop the last commits but cannot corrupt the database).
+    """
+    database_uri = environ.get('DATABASE_URL', 'sqlite:///quiz_master.db')
+    engine_options = {'pool_recycle': _env_int(environ, 'DB_POOL_RECYCLE', 3600)}
+    if _uses_queue_pool(database_uri):
+        engine_options.update(
+            pool_size=_env_int(environ, 'DB_POOL_SIZE', 10),
+            max_overflow=_env_int(environ, 'DB_MAX_OVERFLOW', 20),
+            pool_timeout=_env_int(environ, 'DB_POOL_TIMEOUT', 30)
+        )
+    config = {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options,
+        'SQLITE_PRAGMAS': {
+            'journal_mode': environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+            'synchronous': environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+            'busy_timeout': _env_int(environ, 'SQLITE_BUSY_TIMEOUT_MS', 5000),
+            # Negative values are KiB, so -65536 is a 64 MiB page cache per connection
+            'cache_size': _env_int(environ, 'SQLITE_CACHE_SIZE', -65536),
+            'mmap_size': _env_int(environ, 'SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+            'temp_store': 'MEMORY'
+        },
+        'SUBMISSION_WRITER': _env_bool(environ, 'SUBMISSION_WRITER', False),
+        'RESPONSE_STORAGE': environ.get('RESPONSE_STORAGE', 'rows')
+    }
+    if environ.get('SECRET_KEY'):
+        config['SECRET_KEY'] = environ['SECRET_KEY']
+    return config
+
+PROFILES = {'production': production_config}
+
+def profile_config(environ=os.environ):
+    """The settings of the profile named by QUIZ_MASTER_CONFIG, or {} when none is set"""
+    name = environ.get('QUIZ_MASTER_CONFIG')
+    if not name:
+        return {}
+    if name not in PROFILES:
+        raise ValueError(f'Unknown QUIZ_MASTER_CONFIG profile {name!r}; expected one of {sorted(PROFILES)}')
+    return PROFILES[name](environ)
+
+def init_sqlite(app):
+    """Run the SQLITE_PRAGMAS settings on every new SQLite connection; call after db.init_app"""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+
+    from app.models.models import db
+    with app.app_context():
+        engines = [engine for engine in db.engines.values() if engine.dialect.name == 'sqlite']
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    for engine in engines:
+        event.listen(engine, 'connect', apply_pragmas)
@@ -4,6 +4,13 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+def score_percent(total_scored, total_questions):
+    """
+    A score's whole percentage in SQL, the histogram bucket of app.stats.score_bucket(). The 100 is a literal
+    rather than a bound parameter so queries match the expression in ix_score_quiz_standing.
+    """
+    return total_scored * db.literal_column('100') // total_questions
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), unique=True, nullable=False)
@@ -15,6 +22,11 @@ class User(db.Model):
     
     scores = db.relationship('Score', backref='user', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_user_full_name_lower', db.func.lower(full_name)),
+        db.Index('ix_user_username_lower', db.func.lower(username)),
+    )
+    
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
         
@@ -37,9 +49,13 @@ class Subject(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    chapters_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     chapters = db.relationship('Chapter', backref='subject', lazy=True, cascade="all, delete-orphan")
     
+    __table_args__ = (db.Index('ix_subject_name_lower', db.func.lower(name)),)
+    
     def __repr__(self):
         return f"Subject('{self.name}')"
 
@@ -47,25 +63,35 @@ class Chapter(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    quizzes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     quizzes = db.relationship('Quiz', backref='chapter', lazy=True, cascade="all, delete-orphan")
     
+    __table_args__ = (db.Index('ix_chapter_name_lower', db.func.lower(name)),)
+    
     def __repr__(self):
         return f"Chapter('{self.name}')"
 
 class Quiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=False)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=False, index=True)
     title = db.Column(db.String(100), nullable=False)
-    date_of_quiz = db.Column(db.Date, nullable=False)
+    date_of_quiz = db.Column(db.Date, nullable=False, index=True)
     time_duration = db.Column(db.String(5), nullable=False)
     remarks = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    questions_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    questions_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     questions = db.relationship('Question', backref='quiz', lazy=True, cascade="all, delete-orphan")
     scores = db.relationship('Score', backref='quiz', lazy=True, cascade="all, delete-orphan")
+    stats = db.relationship('QuizStats', backref='quiz', lazy=True, uselist=False, cascade="all, delete-orphan")
+    
+    __table_args__ = (db.Index('ix_quiz_title_lower', db.func.lower(title)),)
     
     def __repr__(self):
         return f"Quiz('{self.title}')"
@@ -109,7 +135,7 @@ class Quiz(db.Model):
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
     question_statement = db.Column(db.Text, nullable=False)
     option1 = db.Column(db.String(200), nullable=False)
     option2 = db.Column(db.String(200), nullable=False)
@@ -117,16 +143,62 @@ class Question(db.Model):
     option4 = db.Column(db.String(200), nullable=False)
     correct_option = db.Column(db.Integer, nullable=False)
     
+    # Passive: deletes clear Response rows in bulk with app.analytics.delete_responses() first
+    responses = db.relationship('Response', backref='question', lazy=True, cascade="all, delete-orphan",
+                                passive_deletes=True)
+    
     def __repr__(self):
         return f"Question('{self.question_statement[:30]}...')"
 
 class Score(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     time_stamp_of_attempt = db.Column(db.DateTime, default=datetime.utcnow)
     total_scored = db.Column(db.Integer, nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
+    # Packed per-question answers when RESPONSE_STORAGE is 'packed' (see app.analytics), and the
+    # quiz's questions_version they were graded against
+    answers = db.Column(db.LargeBinary)
+    answers_version = db.Column(db.Integer)
+    
+    __table_args__ = (
+        db.Index('uq_score_user_quiz', 'user_id', 'quiz_id', unique=True),
+        # Leaderboard order: highest percentage first, earlier attempts first among equal percentages
+        db.Index('ix_score_quiz_standing', 'quiz_id', score_percent(total_scored, total_questions).desc(),
+                 'time_stamp_of_attempt'),
+    )
+    
+    responses = db.relationship('Response', backref='score', lazy=True, cascade="all, delete-orphan",
+                                passive_deletes=True)
+    
+    def __repr__(self):
+        return f"Score(Quiz: {self.quiz_id}, User: {self.user_id}, Score: {self.total_scored}/{self.total_questions})"
+
+class QuizStats(db.Model):
+    """Running totals over every Score of a quiz, updated by each submission"""
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    score_sq_sum = db.Column(db.Integer, nullable=False, default=0)
+    # Attempt counts by whole percentage scored, 0 to 100
+    histogram = db.Column(db.JSON, nullable=False)
+    
+    def __repr__(self):
+        return f"QuizStats(Quiz: {self.quiz_id}, Attempts: {self.attempts})"
+
+class Response(db.Model):
+    """The option a user picked for one question of an attempt"""
+    __table_args__ = (
+        # Covers the per-question correctness counts without touching the table
+        db.Index('ix_response_question_correct', 'question_id', 'is_correct'),
+        {'sqlite_with_rowid': False},
+    )
+
+    score_id = db.Column(db.Integer, db.ForeignKey('score.id'), primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), primary_key=True)
+    selected_option = db.Column(db.SmallInteger, nullable=False)
+    is_correct = db.Column(db.Boolean, nullable=False)
     
     def __repr__(self):
-        return f"Score(Quiz: {self.quiz_id}, User: {self.user_id}, Score: {self.total_scored}/{self.total_questions})" 
\ No newline at end of file
+        return f"Response(Score: {self.score_id}, Question: {self.question_id}, Option: {self.selected_option})" 
\ No newline at end of file
@@ -1,10 +1,18 @@
 from flask import Blueprint, render_template, redirect, url_for, session, flash, request, jsonify
 from app.models.models import Admin, User, Subject, Chapter, Quiz, Question, Score, db
 from app.forms import SubjectForm, ChapterForm, QuizForm, QuestionForm
-from app.utils import is_json_requested, serialize_subject, serialize_chapter, serialize_quiz, serialize_question, serialize_score
+from app.utils import (is_json_requested, serialize_subject, serialize_chapter, serialize_quiz, serialize_question, serialize_score,
+                       serialize_subjects, serialize_chapters, serialize_quizzes, prefetch_chapters, adjust_count, keyset_paginate,
+                       prefetch_quizzes, prefetch_questions, prefetch_users, subjects_with_counts,
+                       conditional_json, catalog_version, availability_version)
 from flask_login import login_required
 from app.routes.auth import admin_required, csrf_protected
+from app.search import search_models, suggest, SUGGEST_COLUMNS
+from app.cache import questions_changed, forget_quiz, dashboard_stats, get_answer_key
+from app.catalog import catalog_changed
+from app.analytics import question_correctness, correctness_rate, delete_responses
 from datetime import datetime
+from sqlalchemy import func
 
 admin = Blueprint('admin', __name__)
 
@@ -57,38 +65,28 @@ def dashboard():
       401:
         description: Not authenticated as admin
     """
-    user_count = User.query.count()
+    counts = dashboard_stats().counts()
     
-    subject_count = Subject.query.count()
-    
-    chapter_count = Chapter.query.count()
-    
-    quiz_count = Quiz.query.count()
-    
-    recent_subjects = Subject.query.order_by(Subject.created_at.desc()).limit(5).all()
+    recent_subjects = dashboard_stats().recent_subjects()
     
     if is_json_requested():
         return jsonify({
             'success': True,
-            'counts': {
-                'users': user_count,
-                'subjects': subject_count,
-                'chapters': chapter_count,
-                'quizzes': quiz_count
-            },
-            'recent_subjects': [serialize_subject(subject) for subject in recent_subjects]
+            'counts': counts,
+            'recent_subjects': recent_subjects
         })
         
     return render_template('admin/dashboard.html',
                            title='Admin Dashboard',
-                           user_count=user_count,
-                           subject_count=subject_count,
-                           chapter_count=chapter_count,
-                           quiz_count=quiz_count,
+                           user_count=counts['users'],
+                           subject_count=counts['subjects'],
+                           chapter_count=counts['chapters'],
+                           quiz_count=counts['quizzes'],
                            recent_subjects=recent_subjects)
 
 @admin.route('/subjects')
 @admin_required
+@conditional_json(lambda: catalog_version(Subject))
 def subject_list():
     """
     List Subjects
@@ -96,9 +94,25 @@ def subject_list():
     tags:
       - admin
     summary: Get all subjects
-    description: Returns a list of all subjects
+    description: Returns a page of subjects ordered by id
     security:
       - session: []
+    parameters:
+      - name: limit
+        in: query
+        description: Maximum number of rows to return (default 50, max 500)
+        required: false
+        type: integer
+      - name: after
+        in: query
+        description: Return rows with an id greater than this cursor (pagination.next_after of the previous page)
+        required: false
+        type: integer
+      - name: before
+        in: query
+        description: Return rows with an id less than this cursor (pagination.prev_before of the next page)
+        required: false
+        type: integer
     responses:
       200:
         description: Successful operation
@@ -111,6 +125,17 @@ def subject_list():
                   type: boolean
                 count:
                   type: integer
+                pagination:
+                  type: object
+                  properties:
+                    limit:
+                      type: integer
+                    next_after:
+                      type: integer
+                    prev_before:
+                      type: integer
+                    has_more:
+                      type: boolean
                 subjects:
                   type: array
                   items:
@@ -125,18 +150,21 @@ def subject_list():
       401:
         description: Not authenticated as admin
     """
-    subjects = Subject.query.all()
+    pagination = keyset_paginate(Subject.query, Subject)
+    subjects = pagination.items
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'count': len(subjects),
-            'subjects': [serialize_subject(subject) for subject in subjects]
+            'subjects': serialize_subjects(subjects),
+            'pagination': pagination.to_dict()
         })
         
     return render_template('admin/subjects/list.html', 
                            title='Subject Management',
-                           subjects=subjects)
+                           subjects=subjects,
+                           pagination=pagination)
 
 @admin.route('/subjects/create', methods=['GET', 'POST'])
 @admin_required
@@ -209,7 +237,11 @@ def subject_create():
             created_at=datetime.utcnow()
         )
         db.session.add(subject)
+        stats_generation = dashboard_stats().generation()
         db.session.commit()
+        catalog_changed()
+        dashboard_stats().adjust(stats_generation, subjects=1)
+        dashboard_stats().forget_recent_subjects()
         
         if is_json_requested():
             return jsonify({
@@ -294,7 +326,7 @@ def subject_detail(id):
         return jsonify({
             'success': True,
             'subject': serialize_subject(subject),
-            'chapters': [serialize_chapter(chapter) for chapter in subject.chapters]
+            'chapters': serialize_chapters(subject.chapters)
         })
     return redirect(url_for('admin.subject_edit', id=id))
 
@@ -375,6 +407,8 @@ def subject_edit(id):
         subject.name = form.name.data
         subject.description = form.description.data
         db.session.commit()
+        catalog_changed()
+        dashboard_stats().forget_recent_subjects()
         
         if is_json_requested():
             return jsonify({
@@ -435,8 +469,15 @@ def subject_delete(id):
         description: Subject not found
     """
     subject = Subject.query.get_or_404(id)
+    chapter_count = subject.chapters_count
+    quiz_count = db.session.query(func.coalesce(func.sum(Chapter.quizzes_count), 0)).filter_by(subject_id=id).scalar()
+    delete_responses(Chapter.subject_id == id)
     db.session.delete(subject)
+    stats_generation = dashboard_stats().generation()
     db.session.commit()
+    catalog_changed()
+    dashboard_stats().adjust(stats_generation, subjects=-1, chapters=-chapter_count, quizzes=-quiz_count)
+    dashboard_stats().forget_recent_subjects()
     
     if is_json_requested():
         return jsonify({
@@ -449,6 +490,7 @@ def subject_delete(id):
 
 @admin.route('/api/subjects', methods=['GET'])
 @admin_required
+@conditional_json(lambda: catalog_version(Subject, Chapter, Quiz))
 def api_subjects():
     """
     Admin Subjects API
@@ -492,12 +534,7 @@ def api_subjects():
       401:
         description: Not authenticated as admin
     """
-    subjects = Subject.query.all()
-    
-    for subject in subjects:
-        subject.chapter_count = Chapter.query.filter_by(subject_id=subject.id).count()
-        chapter_ids = [c.id for c in Chapter.query.filter_by(subject_id=subject.id).all()]
-        subject.quiz_count = Quiz.query.filter(Quiz.chapter_id.in_(chapter_ids)).count() if chapter_ids else 0
+    subjects = subjects_with_counts()
     
     return jsonify({
         'success': True,
@@ -506,14 +543,94 @@ def api_subjects():
             'id': s.id,
             'name': s.name,
             'description': s.description,
-            'chapter_count': s.chapter_count,
-            'quiz_count': s.quiz_count,
-            'date_created': s.date_created.isoformat() if s.date_created else None
-        } for s in subjects]
+            'chapter_count': chapter_count,
+            'quiz_count': quiz_count,
+            'date_created': s.created_at.isoformat() if s.created_at else None
+        } for s, chapter_count, quiz_count in subjects]
+    })
+
+@admin.route('/api/suggest', methods=['GET'])
+@admin_required
+def api_suggest():
+    """
+    Admin Typeahead Suggestions
+    ---
+    tags:
+      - admin
+    summary: Autocomplete names by prefix (admin only)
+    description: Returns the first matches, in alphabetical order, whose name starts with the given prefix (ignoring case for A-Z; other letters must match exactly). Users match on full name or username.
+    security:
+      - session: []
+    parameters:
+      - name: q
+        in: query
+        description: Prefix typed so far
+        required: true
+        schema:
+          type: string
+      - name: type
+        in: query
+        description: What to autocomplete
+        required: false
+        schema:
+          type: string
+          enum: [subjects, chapters, quizzes, users]
+          default: subjects
+      - name: limit
+        in: query
+        description: Maximum number of suggestions (max 25)
+        required: false
+        schema:
+          type: integer
+          default: 10
+    responses:
+      200:
+        description: Successful operation
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                query:
+                  type: string
+                type:
+                  type: string
+                suggestions:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      id:
+                        type: integer
+                      label:
+                        type: string
+      400:
+        description: Unknown suggestion type
+      401:
+        description: Not authenticated as admin
+    """
+    query = request.args.get('q', '')
+    suggest_type = request.args.get('type', 'subjects')
+    limit = max(1, min(request.args.get('limit', 10, type=int), 25))
+    
+    if suggest_type not in SUGGEST_COLUMNS:
+        return jsonify({
+            'success': False,
+            'message': f'Unknown suggestion type: {suggest_type}'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'query': query,
+        'type': suggest_type,
+        'suggestions': suggest(suggest_type, query, limit)
     })
 
 @admin.route('/chapters')
 @admin_required
+@conditional_json(lambda: catalog_version(Subject, Chapter))
 def chapter_list():
     """
     List Chapters
@@ -521,9 +638,25 @@ def chapter_list():
     tags:
       - admin
     summary: Get all chapters
-    description: Returns a list of all chapters
+    description: Returns a page of chapters ordered by id
     security:
       - session: []
+    parameters:
+      - name: limit
+        in: query
+        description: Maximum number of rows to return (default 50, max 500)
+        required: false
+        type: integer
+      - name: after
+        in: query
+        description: Return rows with an id greater than this cursor (pagination.next_after of the previous page)
+        required: false
+        type: integer
+      - name: before
+        in: query
+        description: Return rows with an id less than this cursor (pagination.prev_before of the next page)
+        required: false
+        type: integer
     responses:
       200:
         description: Successful operation
@@ -536,6 +669,17 @@ def chapter_list():
                   type: boolean
                 count:
                   type: integer
+                pagination:
+                  type: object
+                  properties:
+                    limit:
+                      type: integer
+                    next_after:
+                      type: integer
+                    prev_before:
+                      type: integer
+                    has_more:
+                      type: boolean
                 chapters:
                   type: array
                   items:
@@ -554,18 +698,21 @@ def chapter_list():
       401:
         description: Not authenticated as admin
     """
-    chapters = Chapter.query.all()
+    pagination = keyset_paginate(Chapter.query, Chapter)
+    chapters = pagination.items
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'count': len(chapters),
-            'chapters': [serialize_chapter(chapter) for chapter in chapters]
+            'chapters': serialize_chapters(chapters),
+            'pagination': pagination.to_dict()
         })
         
     return render_template('admin/chapters/list.html', 
                            title='Chapter Management',
-                           chapters=chapters)
+                           chapters=prefetch_chapters(chapters),
+                           pagination=pagination)
 
 @admin.route('/chapters/create', methods=['GET', 'POST'])
 @admin_required
@@ -648,7 +795,12 @@ def chapter_create():
             created_at=datetime.utcnow()
         )
         db.session.add(chapter)
+        adjust_count(Subject.chapters_count, chapter.subject_id, 1)
+        stats_generation = dashboard_stats().generation()
         db.session.commit()
+        catalog_changed()
+        dashboard_stats().adjust(stats_generation, chapters=1)
+        dashboard_stats().forget_recent_subjects()
         
         if is_json_requested():
             return jsonify({
@@ -680,7 +832,7 @@ def chapter_detail(id):
         return jsonify({
             'success': True,
             'chapter': serialize_chapter(chapter),
-            'quizzes': [serialize_quiz(quiz) for quiz in chapter.quizzes]
+            'quizzes': serialize_quizzes(chapter.quizzes)
         })
     return redirect(url_for('admin.chapter_edit', id=id))
 
@@ -693,10 +845,16 @@ def chapter_edit(id):
     form.subject_id.choices = [(s.id, s.name) for s in Subject.query.all()]
     
     if form.validate_on_submit():
+        old_subject_id = chapter.subject_id
         chapter.name = form.name.data
         chapter.description = form.description.data
         chapter.subject_id = form.subject_id.data
+        if chapter.subject_id != old_subject_id:
+            adjust_count(Subject.chapters_count, old_subject_id, -1)
+            adjust_count(Subject.chapters_count, chapter.subject_id, 1)
+            dashboard_stats().forget_recent_subjects()
         db.session.commit()
+        catalog_changed()
         
         if is_json_requested():
             return jsonify({
@@ -724,8 +882,15 @@ def chapter_edit(id):
 @csrf_protected
 def chapter_delete(id):
     chapter = Chapter.query.get_or_404(id)
+    adjust_count(Subject.chapters_count, chapter.subject_id, -1)
+    quiz_count = chapter.quizzes_count
+    delete_responses(Quiz.chapter_id == id)
     db.session.delete(chapter)
+    stats_generation = dashboard_stats().generation()
     db.session.commit()
+    catalog_changed()
+    dashboard_stats().adjust(stats_generation, chapters=-1, quizzes=-quiz_count)
+    dashboard_stats().forget_recent_subjects()
     
     if is_json_requested():
         return jsonify({
@@ -738,6 +903,7 @@ def chapter_delete(id):
 
 @admin.route('/quizzes')
 @admin_required
+@conditional_json(lambda: (catalog_version(Subject, Chapter, Quiz), availability_version()))
 def quiz_list():
     """
     List Quizzes
@@ -745,9 +911,25 @@ def quiz_list():
     tags:
       - admin
     summary: Get all quizzes
-    description: Returns a list of all quizzes
+    description: Returns a page of quizzes ordered by id
     security:
       - session: []
+    parameters:
+      - name: limit
+        in: query
+        description: Maximum number of rows to return (default 50, max 500)
+        required: false
+        type: integer
+      - name: after
+        in: query
+        description: Return rows with an id greater than this cursor (pagination.next_after of the previous page)
+        required: false
+        type: integer
+      - name: before
+        in: query
+        description: Return rows with an id less than this cursor (pagination.prev_before of the next page)
+        required: false
+        type: integer
     responses:
       200:
         description: Successful operation
@@ -760,6 +942,17 @@ def quiz_list():
                   type: boolean
                 count:
                   type: integer
+                pagination:
+                  type: object
+                  properties:
+                    limit:
+                      type: integer
+                    next_after:
+                      type: integer
+                    prev_before:
+                      type: integer
+                    has_more:
+                      type: boolean
                 quizzes:
                   type: array
                   items:
@@ -785,18 +978,21 @@ def quiz_list():
       401:
         description: Not authenticated as admin
     """
-    quizzes = Quiz.query.all()
+    pagination = keyset_paginate(Quiz.query, Quiz)
+    quizzes = pagination.items
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'count': len(quizzes),
-            'quizzes': [serialize_quiz(quiz) for quiz in quizzes]
+            'quizzes': serialize_quizzes(quizzes),
+            'pagination': pagination.to_dict()
         })
         
     return render_template('admin/quizzes/list.html', 
                            title='Quiz Management',
-                           quizzes=quizzes)
+                           quizzes=prefetch_quizzes(quizzes),
+                           pagination=pagination)
 
 @admin.route('/quizzes/create', methods=['GET', 'POST'])
 @admin_required
@@ -896,7 +1092,11 @@ def quiz_create():
             remarks=form.remarks.data
         )
         db.session.add(quiz)
+        adjust_count(Chapter.quizzes_count, quiz.chapter_id, 1)
+        stats_generation = dashboard_stats().generation()
         db.session.commit()
+        catalog_changed()
+        dashboard_stats().adjust(stats_generation, quizzes=1)
         
         if is_json_requested():
             return jsonify({
@@ -1071,12 +1271,17 @@ def quiz_edit(id):
     form.chapter_id.choices = [(c.id, f"{c.name} ({c.subject.name})") for c in Chapter.query.all()]
     
     if form.validate_on_submit():
+        old_chapter_id = quiz.chapter_id
         quiz.title = form.title.data
         quiz.chapter_id = form.chapter_id.data
         quiz.date_of_quiz = form.date_of_quiz.data
         quiz.time_duration = form.time_duration.data
         quiz.remarks = form.remarks.data
+        if quiz.chapter_id != old_chapter_id:
+            adjust_count(Chapter.quizzes_count, old_chapter_id, -1)
+            adjust_count(Chapter.quizzes_count, quiz.chapter_id, 1)
         db.session.commit()
+        catalog_changed()
         
         if is_json_requested():
             return jsonify({
@@ -1133,8 +1338,14 @@ def quiz_delete(id):
         description: Quiz not found
     """
     quiz = Quiz.query.get_or_404(id)
+    adjust_count(Chapter.quizzes_count, quiz.chapter_id, -1)
+    delete_responses(Question.quiz_id == id)
     db.session.delete(quiz)
+    stats_generation = dashboard_stats().generation()
     db.session.commit()
+    catalog_changed()
+    forget_quiz(id)
+    dashboard_stats().adjust(stats_generation, quizzes=-1)
     
     if is_json_requested():
         return jsonify({
@@ -1154,7 +1365,7 @@ def question_list(quiz_id):
     tags:
       - admin
     summary: Get all questions for a quiz
-    description: Returns a list of all questions for a specific quiz
+    description: Returns a page of the questions of a specific quiz, ordered by id
     security:
       - session: []
     parameters:
@@ -1164,6 +1375,21 @@ def question_list(quiz_id):
         required: true
         schema:
           type: integer
+      - name: limit
+        in: query
+        description: Maximum number of rows to return (default 50, max 500)
+        required: false
+        type: integer
+      - name: after
+        in: query
+        description: Return rows with an id greater than this cursor (pagination.next_after of the previous page)
+        required: false
+        type: integer
+      - name: before
+        in: query
+        description: Return rows with an id less than this cursor (pagination.prev_before of the next page)
+        required: false
+        type: integer
     responses:
       200:
         description: Successful operation
@@ -1183,6 +1409,17 @@ def question_list(quiz_id):
                       type: string
                 count:
                   type: integer
+                pagination:
+                  type: object
+                  properties:
+                    limit:
+                      type: integer
+                    next_after:
+                      type: integer
+                    prev_before:
+                      type: integer
+                    has_more:
+                      type: boolean
                 questions:
                   type: array
                   items:
@@ -1198,26 +1435,40 @@ def question_list(quiz_id):
                           type: string
                       correct_option:
                         type: integer
+                      responses:
+                        type: integer
+                        description: Number of recorded answers to the question
+                      correct:
+                        type: integer
+                      correct_rate:
+                        type: number
+                        description: Percentage of answers that were correct, or null if unanswered
       401:
         description: Not authenticated as admin
       404:
         description: Quiz not found
     """
     quiz = Quiz.query.get_or_404(quiz_id)
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
+    pagination = keyset_paginate(Question.query.filter_by(quiz_id=quiz_id), Question)
+    questions = pagination.items
+    correctness = question_correctness(quiz, get_answer_key(quiz))
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'quiz': serialize_quiz(quiz),
             'count': len(questions),
-            'questions': [serialize_question(q, include_correct_answer=True) for q in questions]
+            'questions': [{**serialize_question(q, include_correct_answer=True), **correctness_rate(correctness, q.id)}
+                          for q in questions],
+            'pagination': pagination.to_dict()
         })
         
     return render_template('admin/questions/list.html', 
                            title=f'Questions for {quiz.title}',
                            quiz=quiz,
-                           questions=questions)
+                           questions=questions,
+                           rates={q.id: correctness_rate(correctness, q.id) for q in questions},
+                           pagination=pagination)
 
 @admin.route('/quizzes/<int:quiz_id>/questions/create', methods=['GET', 'POST'])
 @admin_required
@@ -1328,7 +1579,10 @@ def question_create(quiz_id):
             correct_option=form.correct_option.data
         )
         db.session.add(question)
+        adjust_count(Quiz.questions_count, quiz_id, 1)
+        questions_changed(quiz_id)
         db.session.commit()
+        catalog_changed()
         
         if is_json_requested():
             return jsonify({
@@ -1431,6 +1685,7 @@ def question_edit(id):
         question.option3 = form.option3.data
         question.option4 = form.option4.data
         question.correct_option = form.correct_option.data
+        questions_changed(question.quiz_id)
         db.session.commit()
         
         if is_json_requested():
@@ -1490,8 +1745,12 @@ def question_delete(id):
     """
     question = Question.query.get_or_404(id)
     quiz_id = question.quiz_id
+    adjust_count(Quiz.questions_count, quiz_id, -1)
+    questions_changed(quiz_id)
+    delete_responses(Question.id == id)
     db.session.delete(question)
     db.session.commit()
+    catalog_changed()
     
     if is_json_requested():
         return jsonify({
@@ -1511,7 +1770,23 @@ def user_list():
     tags:
       - admin
     summary: Get all registered users
-    description: Returns a list of all users in the system
+    description: Returns a page of the users in the system, ordered by id
+    parameters:
+      - name: limit
+        in: query
+        description: Maximum number of rows to return (default 50, max 500)
+        required: false
+        type: integer
+      - name: after
+        in: query
+        description: Return rows with an id greater than this cursor (pagination.next_after of the previous page)
+        required: false
+        type: integer
+      - name: before
+        in: query
+        description: Return rows with an id less than this cursor (pagination.prev_before of the next page)
+        required: false
+        type: integer
     responses:
       200:
         description: List of users
@@ -1524,6 +1799,17 @@ def user_list():
                   type: boolean
                 count:
                   type: integer
+                pagination:
+                  type: object
+                  properties:
+                    limit:
+                      type: integer
+                    next_after:
+                      type: integer
+                    prev_before:
+                      type: integer
+                    has_more:
+                      type: boolean
                 users:
                   type: array
                   items:
@@ -1539,7 +1825,8 @@ def user_list():
                         type: string
                         format: date-time
     """
-    users = User.query.all()
+    pagination = keyset_paginate(User.query, User)
+    users = pagination.items
     
     if is_json_requested():
         result = []
@@ -1555,12 +1842,15 @@ def user_list():
         return jsonify({
             'success': True,
             'count': len(users),
-            'users': result
+            'users': result,
+            'pagination': pagination.to_dict()
         })
         
     return render_template('admin/users/list.html', 
                            title='User Management',
-                           users=users)
+                           users=prefetch_users(users),
+                           total_users=dashboard_stats().counts()['users'],
+                           pagination=pagination)
 
 @admin.route('/search', methods=['GET'])
 @admin_required
@@ -1587,6 +1877,20 @@ def search():
           type: string
           enum: [all, subjects, chapters, quizzes, questions, users]
           default: all
+      - name: page
+        in: query
+        description: Page of results for each content type
+        required: false
+        schema:
+          type: integer
+          default: 1
+      - name: limit
+        in: query
+        description: Results per content type per page (max 100)
+        required: false
+        schema:
+          type: integer
+          default: 20
     responses:
       200:
         description: Search results
@@ -1663,48 +1967,34 @@ def search():
                                users=[],
                                questions=[])
     
+    page = max(request.args.get('page', 1, type=int), 1)
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    offset = (page - 1) * limit
+    
     subject_results = []
     if search_type in ['all', 'subjects']:
-        subject_results = Subject.query.filter(
-            (Subject.name.ilike(f'%{query}%')) |
-            (Subject.description.ilike(f'%{query}%'))
-        ).all()
+        subject_results = search_models(Subject, query, limit, offset)
     
     chapter_results = []
     if search_type in ['all', 'chapters']:
-        chapter_results = Chapter.query.filter(
-            (Chapter.name.ilike(f'%{query}%')) |
-            (Chapter.description.ilike(f'%{query}%'))
-        ).all()
-
+        chapter_results = search_models(Chapter, query, limit, offset)
+    
     quiz_results = []
     if search_type in ['all', 'quizzes']:
-        quiz_results = Quiz.query.filter(
-            (Quiz.title.ilike(f'%{query}%')) |
-            (Quiz.remarks.ilike(f'%{query}%'))
-        ).all()
+        quiz_results = search_models(Quiz, query, limit, offset)
     
     question_results = []
     if search_type in ['all', 'questions']:
-        question_results = Question.query.filter(
-            (Question.question_statement.ilike(f'%{query}%')) |
-            (Question.option1.ilike(f'%{query}%')) |
-            (Question.option2.ilike(f'%{query}%')) |
-            (Question.option3.ilike(f'%{query}%')) |
-            (Question.option4.ilike(f'%{query}%'))
-        ).all()
+        question_results = search_models(Question, query, limit, offset)
     
     user_results = []
     if search_type in ['all', 'users']:
-        user_results = User.query.filter(
-            (User.full_name.ilike(f'%{query}%')) |
-            (User.username.ilike(f'%{query}%'))
-        ).all()
+        user_results = search_models(User, query, limit, offset)
     
     if is_json_requested():
-        subjects = [serialize_subject(subject) for subject in subject_results]
-        chapters = [serialize_chapter(chapter) for chapter in chapter_results]
-        quizzes = [serialize_quiz(quiz) for quiz in quiz_results]
+        subjects = serialize_subjects(subject_results)
+        chapters = serialize_chapters(chapter_results)
+        quizzes = serialize_quizzes(quiz_results)
         questions = [serialize_question(q, include_correct_answer=True) for q in question_results]
         users = []
         for user in user_results:
@@ -1719,6 +2009,8 @@ def search():
             'success': True,
             'query': query,
             'search_type': search_type,
+            'page': page,
+            'limit': limit,
             'subjects': subjects,
             'chapters': chapters,
             'quizzes': quizzes,
@@ -1730,10 +2022,12 @@ def search():
                            title='Search Results',
                            query=query,
                            search_type=search_type,
+                           page=page,
+                           limit=limit,
                            subjects=subject_results,
-                           chapters=chapter_results,
-                           quizzes=quiz_results,
-                           questions=question_results,
+                           chapters=prefetch_chapters(chapter_results),
+                           quizzes=prefetch_quizzes(quiz_results),
+                           questions=prefetch_questions(question_results),
                            users=user_results)
 
     
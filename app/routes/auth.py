@@ -4,6 +4,7 @@ from app.models.models import User, Admin, db
 from functools import wraps
 from werkzeug.security import check_password_hash, generate_password_hash
 from app.utils import is_json_requested
+from app.cache import dashboard_stats
 from datetime import datetime, timedelta
 import re
 import uuid
@@ -374,7 +375,9 @@ def register():
         
         try:
             db.session.add(new_user)
+            stats_generation = dashboard_stats().generation()
             db.session.commit()
+            dashboard_stats().adjust(stats_generation, users=1)
             
             if is_json_requested():
                 return jsonify({
@@ -0,0 +1,132 @@
+from flask import Blueprint, current_app, request, session, jsonify
+from werkzeug.test import EnvironBuilder
+from app.models.models import db
+from app.routes.auth import login_required
+
+batch = Blueprint('batch', __name__)
+
+BATCHABLE_PREFIXES = ('/admin/', '/user/')
+
+def _run_subrequest(path, etag=None):
+    """Dispatch one GET through the normal request pipeline, inside the current app context and DB session"""
+    app = current_app._get_current_object()
+    headers = {'Accept': 'application/json'}
+    if etag:
+        headers['If-None-Match'] = etag
+    builder = EnvironBuilder(path=path, base_url=request.host_url, method='GET', headers=headers,
+                             environ_base={'REMOTE_ADDR': request.remote_addr})
+    try:
+        ctx = app.request_context(builder.get_environ())
+    finally:
+        builder.close()
+
+    # Reuse the already decoded session; a copy keeps flashes from sub-requests out of the real cookie
+    ctx.session = app.session_interface.session_class(session)
+    with ctx:
+        try:
+            response = app.full_dispatch_request()
+        except Exception:
+            app.logger.exception('Batch sub-request %s failed', path)
+            # The session is shared with the rest of the batch; a failed flush would poison every later sub-request
+            db.session.rollback()
+            return {'path': path, 'status': 500, 'body': {'success': False, 'message': 'Internal server error'}}
+
+    result = {'path': path, 'status': response.status_code}
+    if response.headers.get('ETag'):
+        result['etag'] = response.headers['ETag']
+    if response.is_json:
+        result['body'] = response.get_json()
+    elif response.status_code in (301, 302, 303, 307, 308):
+        result['location'] = response.headers.get('Location')
+    return result
+
+@batch.route('/batch', methods=['POST'])
+@login_required
+def batch_get():
+    """
+    Batch GET
+    ---
+    tags:
+      - batch
+    summary: Run several JSON GET requests in one round-trip
+    description: Runs each sub-request against the admin and user routes as if it had been sent on its own with Accept application/json and the caller's session, sharing one app context and database session. Sub-requests run in order; each one's status, ETag and JSON body are returned in the same order.
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              requests:
+                type: array
+                description: Paths such as "/user/subjects", or objects with a path and the ETag from an earlier response
+                items:
+                  oneOf:
+                    - type: string
+                    - type: object
+                      properties:
+                        path:
+                          type: string
+                        etag:
+                          type: string
+            example:
+              requests: ["/user/dashboard", "/user/subjects", {"path": "/user/chapters/1/quizzes", "etag": "\\"5d41402abc4b2a76b9719d911017c592\\""}]
+    responses:
+      200:
+        description: Results in request order
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                responses:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      path:
+                        type: string
+                      status:
+                        type: integer
+                      etag:
+                        type: string
+                      body:
+                        type: object
+                      location:
+                        type: string
+                        description: Redirect target for 3xx results
+      400:
+        description: Malformed batch, too many sub-requests, or a path outside /admin/ and /user/
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'success': False,
+            'message': 'Provide a non-empty "requests" list.'
+        }), 400
+
+    if len(items) > max_requests:
+        return jsonify({
+            'success': False,
+            'message': f'A batch may contain at most {max_requests} requests.'
+        }), 400
+
+    subrequests = []
+    for item in items:
+        path, etag = (item.get('path'), item.get('etag')) if isinstance(item, dict) else (item, None)
+        if not isinstance(path, str) or not path.startswith(BATCHABLE_PREFIXES):
+            return jsonify({
+                'success': False,
+                'message': f'Batch paths must start with /admin/ or /user/: {path!r}'
+            }), 400
+        subrequests.append((path, etag))
+
+    return jsonify({
+        'success': True,
+        'responses': [_run_subrequest(path, etag) for path, etag in subrequests]
+    })
@@ -1,8 +1,16 @@
 from flask import Blueprint, render_template, session, redirect, url_for, request, flash, jsonify, abort
-from app.models.models import User, Subject, Quiz, Score, Chapter, Question, db
+from app.models.models import User, Subject, Quiz, Score, Chapter
 from app.routes.auth import login_required, user_required
-from app.utils import is_json_requested, serialize_subject, serialize_chapter, serialize_quiz, serialize_question, serialize_score
-from datetime import datetime
+from app.search import search_models
+from app.cache import get_answer_key, get_question_payload, questions_response
+from app.catalog import catalog, subject_node, chapter_node
+from app.stats import quiz_summary, user_standing, leaderboard
+from app.submissions import submit_target, record_score, remember_attempt, find_attempt, attempt_result
+from app.utils import (is_json_requested, serialize_subject,
+                       serialize_subjects, serialize_chapters, serialize_quizzes, serialize_scores,
+                       prefetch_chapters, prefetch_quizzes, prefetch_scores, get_user_scores, user_score_totals,
+                       user_subject_performance, grade_answers, conditional_json,
+                       user_scores_version, availability_version, attempted_quiz_ids)
 import json
 from sqlalchemy import desc, or_
 
@@ -84,8 +92,8 @@ def dashboard():
                 'qualification': user.qualification,
                 'dob': user.dob.isoformat() if user.dob else None
             },
-            'recent_subjects': [serialize_subject(subject) for subject in subjects],
-            'recent_scores': [serialize_score(score) for score in recent_scores]
+            'recent_subjects': serialize_subjects(subjects),
+            'recent_scores': serialize_scores(recent_scores)
         })
     
     return render_template('user/dashboard.html',
@@ -94,6 +102,7 @@ def dashboard():
 
 @user.route('/subjects')
 @user_required
+@conditional_json(lambda: catalog().version)
 def subject_list():
     """
     List Available Subjects API
@@ -131,13 +140,13 @@ def subject_list():
                         type: string
                         example: Basic mathematical concepts and problem-solving
     """
-    subjects = Subject.query.all()
+    subjects = list(catalog().subjects.values())
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'count': len(subjects),
-            'subjects': [serialize_subject(subject) for subject in subjects]
+            'subjects': serialize_subjects(subjects)
         })
     
     return render_template('user/subjects/list.html',
@@ -182,7 +191,9 @@ def subject_detail(subject_id):
       404:
         description: Subject not found
     """
-    subject = Subject.query.get_or_404(subject_id)
+    subject = catalog().subjects.get(subject_id)
+    if subject is None:
+        abort(404)
     
     if is_json_requested():
         return jsonify({
@@ -194,6 +205,7 @@ def subject_detail(subject_id):
 
 @user.route('/subjects/<int:subject_id>/chapters')
 @login_required
+@conditional_json(lambda subject_id: catalog().version)
 def chapter_list(subject_id):
     """
     List Chapters
@@ -246,18 +258,17 @@ def chapter_list(subject_id):
       404:
         description: Subject not found
     """
-    subject = Subject.query.get_or_404(subject_id)
-    chapters = Chapter.query.filter_by(subject_id=subject_id).all()
-    
-    for chapter in chapters:
-        chapter.quiz_count = Quiz.query.filter_by(chapter_id=chapter.id).count()
+    subject = catalog().subjects.get(subject_id)
+    if subject is None:
+        abort(404)
+    chapters = subject.chapters
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'subject': serialize_subject(subject),
             'count': len(chapters),
-            'chapters': [serialize_chapter(chapter) for chapter in chapters]
+            'chapters': serialize_chapters(chapters, prefetch=False)
         })
     
     return render_template('user/chapters/list.html', 
@@ -306,18 +317,21 @@ def chapter_detail(chapter_id):
       404:
         description: Chapter not found
     """
-    chapter = Chapter.query.get_or_404(chapter_id)
+    chapter = catalog().chapters.get(chapter_id)
+    if chapter is None:
+        abort(404)
     
     if is_json_requested():
         return jsonify({
             'success': True,
-            'chapter': serialize_chapter(chapter)
+            'chapter': serialize_chapters([chapter], prefetch=False)[0]
         })
     
     return redirect(url_for('user.quiz_list', chapter_id=chapter_id))
 
 @user.route('/chapters/<int:chapter_id>/quizzes')
 @login_required
+@conditional_json(lambda chapter_id: (catalog().version, user_scores_version(session['user_id']), availability_version()))
 def quiz_list(chapter_id):
     """
     List Quizzes
@@ -400,28 +414,24 @@ def quiz_list(chapter_id):
       404:
         description: Chapter not found
     """
-    chapter = Chapter.query.get_or_404(chapter_id)
-    subject = Subject.query.get(chapter.subject_id)
+    chapter = catalog().chapters.get(chapter_id)
+    if chapter is None:
+        abort(404)
+    subject = chapter.subject
     user_id = session['user_id']
     
-    quizzes = Quiz.query.filter_by(chapter_id=chapter_id).all()
-    
-    for quiz in quizzes:
-        score = Score.query.filter_by(user_id=user_id, quiz_id=quiz.id).first()
-        quiz.user_score = score
-        
-        quiz.is_available = quiz.is_available()
-        quiz.availability_window = quiz.get_availability_window()
+    quizzes = chapter.quizzes
+    user_scores = get_user_scores(user_id, [quiz.id for quiz in quizzes])
     
     if is_json_requested():
         return jsonify({
             'success': True,
             'chapter': {
-                **serialize_chapter(chapter),
+                **serialize_chapters([chapter], prefetch=False)[0],
                 'subject_name': subject.name
             },
             'count': len(quizzes),
-            'quizzes': [serialize_quiz(quiz) for quiz in quizzes]
+            'quizzes': serialize_quizzes(quizzes, user_id, user_scores, prefetch=False)
         })
     
     return render_template('user/quizzes/list.html', 
@@ -475,16 +485,170 @@ def quiz_detail(quiz_id):
         description: Quiz not found
     """
     user_id = session['user_id']
-    quiz = Quiz.query.get_or_404(quiz_id)
+    quiz = catalog().quizzes.get(quiz_id)
+    if quiz is None:
+        abort(404)
     
     if is_json_requested():
         return jsonify({
             'success': True,
-            'quiz': serialize_quiz(quiz, user_id)
+            'quiz': serialize_quizzes([quiz], user_id, prefetch=False)[0]
         })
     
     return redirect(url_for('user.quiz_start', quiz_id=quiz_id))
 
+def _catalog_tree_version():
+    # Admins can browse the catalog too; they have no attempts to mark
+    user_id = session.get('user_id')
+    version = (catalog().version, user_scores_version(user_id) if user_id is not None else None)
+    if request.args.get('depth', 3, type=int) >= 3 or request.args.get('chapter_id') is not None:
+        version += (availability_version(),)
+    return version
+
+@user.route('/catalog')
+@login_required
+@conditional_json(_catalog_tree_version)
+def catalog_tree():
+    """
+    Catalog Tree
+    ---
+    tags:
+      - user
+    summary: Get the subject, chapter and quiz tree in one request
+    description: Returns every subject with its chapters and quizzes, or the subtree under one subject or chapter, with counts and whether the caller has attempted each quiz. Always JSON; requests sent with Accept: application/json also get an ETag for conditional requests.
+    parameters:
+      - name: subject_id
+        in: query
+        description: Return only this subject's subtree
+        required: false
+        schema:
+          type: integer
+      - name: chapter_id
+        in: query
+        description: Return only this chapter's subtree
+        required: false
+        schema:
+          type: integer
+      - name: depth
+        in: query
+        description: Levels to include, counting the root level (3 = subjects, chapters and quizzes)
+        required: false
+        schema:
+          type: integer
+          default: 3
+    responses:
+      200:
+        description: Successful operation
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                depth:
+                  type: integer
+                subjects:
+                  type: array
+                  description: Present for the full tree
+                  items:
+                    $ref: '#/definitions/SubjectNode'
+                subject:
+                  $ref: '#/definitions/SubjectNode'
+                chapter:
+                  $ref: '#/definitions/ChapterNode'
+      404:
+        description: Subject or chapter not found
+    definitions:
+      SubjectNode:
+        type: object
+        properties:
+          id:
+            type: integer
+          name:
+            type: string
+          description:
+            type: string
+          chapters_count:
+            type: integer
+          quizzes_count:
+            type: integer
+          attempted_count:
+            type: integer
+          chapters:
+            type: array
+            items:
+              $ref: '#/definitions/ChapterNode'
+      ChapterNode:
+        type: object
+        properties:
+          id:
+            type: integer
+          name:
+            type: string
+          description:
+            type: string
+          subject_id:
+            type: integer
+          quizzes_count:
+            type: integer
+          attempted_count:
+            type: integer
+          quizzes:
+            type: array
+            items:
+              type: object
+              properties:
+                id:
+                  type: integer
+                title:
+                  type: string
+                date_of_quiz:
+                  type: string
+                  format: date
+                time_duration:
+                  type: string
+                questions_count:
+                  type: integer
+                is_available:
+                  type: boolean
+                attempted:
+                  type: boolean
+    """
+    snapshot = catalog()
+    user_id = session.get('user_id')
+    attempted = attempted_quiz_ids(user_id) if user_id is not None else set()
+    depth = max(1, min(request.args.get('depth', 3, type=int), 3))
+    subject_id = request.args.get('subject_id', type=int)
+    chapter_id = request.args.get('chapter_id', type=int)
+    
+    if chapter_id is not None:
+        chapter = snapshot.chapters.get(chapter_id)
+        if chapter is None:
+            abort(404)
+        depth = min(depth, 2)
+        return jsonify({
+            'success': True,
+            'depth': depth,
+            'chapter': chapter_node(chapter, depth, attempted)
+        })
+    
+    if subject_id is not None:
+        subject = snapshot.subjects.get(subject_id)
+        if subject is None:
+            abort(404)
+        return jsonify({
+            'success': True,
+            'depth': depth,
+            'subject': subject_node(subject, depth, attempted)
+        })
+    
+    return jsonify({
+        'success': True,
+        'depth': depth,
+        'subjects': [subject_node(subject, depth, attempted) for subject in snapshot.subjects.values()]
+    })
+
 @user.route('/quizzes/<int:quiz_id>/questions')
 @login_required
 def quiz_questions(quiz_id):
@@ -563,8 +727,8 @@ def quiz_questions(quiz_id):
         flash(f'This quiz is not available for attempt at this time. It is scheduled for {quiz.date_of_quiz.strftime("%Y-%m-%d")} during the time window {availability_window}.', 'warning')
         return redirect(url_for('user.quiz_list', chapter_id=quiz.chapter_id))
     
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-    if not questions:
+    payload = get_question_payload(quiz)
+    if not payload.questions:
         if is_json_requested():
             return jsonify({
                 'success': False,
@@ -577,15 +741,14 @@ def quiz_questions(quiz_id):
     total_seconds = int(duration_parts[0]) * 3600 + int(duration_parts[1]) * 60
     
     if is_json_requested():
-        return jsonify({
+        return questions_response({
             'success': True,
             'quiz_id': quiz.id,
             'title': quiz.title,
-            'total_questions': len(questions),
+            'total_questions': len(payload.questions),
             'time_duration': quiz.time_duration,
-            'total_seconds': total_seconds,
-            'questions': [serialize_question(question) for question in questions]
-        })
+            'total_seconds': total_seconds
+        }, payload)
     
     return redirect(url_for('user.quiz_start', quiz_id=quiz_id))
 
@@ -666,8 +829,8 @@ def quiz_start(quiz_id):
         flash(f'This quiz is not available for attempt at this time. It is scheduled for {quiz.date_of_quiz.strftime("%Y-%m-%d")} during the time window {availability_window}.', 'warning')
         return redirect(url_for('user.quiz_list', chapter_id=quiz.chapter_id))
 
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-    if not questions:
+    payload = get_question_payload(quiz)
+    if not payload.questions:
         if is_json_requested():
             return jsonify({
                 'success': False,
@@ -680,19 +843,19 @@ def quiz_start(quiz_id):
     total_seconds = int(duration_parts[0]) * 3600 + int(duration_parts[1]) * 60
     
     if is_json_requested():
-        return jsonify({
+        return questions_response({
             'success': True,
             'quiz_id': quiz.id,
             'title': quiz.title,
             'time_duration': quiz.time_duration,
-            'total_seconds': total_seconds,
-            'questions': [serialize_question(question) for question in questions]
-        })
+            'total_seconds': total_seconds
+        }, payload)
     
     return render_template('user/quizzes/attempt.html',
                           title=f'Attempt Quiz: {quiz.title}',
                           quiz=quiz,
-                          questions=questions,
+                          questions=payload.questions,
+                          question_block=payload.html,
                           total_seconds=total_seconds)
 
 @user.route('/quizzes/<int:quiz_id>/submit', methods=['POST'])
@@ -768,22 +931,12 @@ def quiz_submit(quiz_id):
         description: Quiz not found or has no questions
     """
     user_id = session['user_id']
-    quiz = Quiz.query.get_or_404(quiz_id)
-    existing_score = Score.query.filter_by(user_id=user_id, quiz_id=quiz_id).first()
-    if existing_score:
-        if is_json_requested():
-            return jsonify({
-                'success': False,
-                'message': f'You have already attempted this quiz. You scored {existing_score.total_scored} out of {existing_score.total_questions} questions.'
-            }), 403
-        flash('You have already attempted this quiz!', 'warning')
-        return redirect(url_for('user.quiz_list', chapter_id=quiz.chapter_id))
+    quiz = submit_target(quiz_id)
+    if quiz is None:
+        abort(404)
     
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-    total_questions = len(questions)
-    
-    score = 0
-    user_answers = {}
+    answer_key = get_answer_key(quiz)
+    total_questions = len(answer_key)
     
     if request.is_json:
         data = request.get_json()
@@ -793,62 +946,37 @@ def quiz_submit(quiz_id):
                 'message': 'No answers provided!'
             }), 400
         
-        user_answers = data['answers']  
-        for question in questions:
-            question_id = str(question.id)
-            correct = False
-            user_answer = None
-            
-            if question_id in user_answers:
-                user_answer = int(user_answers[question_id])
-                user_answers[question.id] = user_answer
-                if user_answer == question.correct_option:
-                    score += 1
-                    correct = True
+        submitted = data['answers']
+        score, _, question_results = grade_answers(
+            answer_key, lambda question_id: submitted.get(str(question_id)))
     else:
-        
-        user_answers = {}
-        
-        for question in questions:
-            answer_key = f'question_{question.id}'
-            correct = False
-            user_answer = None
-            
-            if answer_key in request.form:
-                user_answer = int(request.form[answer_key])
-                user_answers[question.id] = user_answer
-                if user_answer == question.correct_option:
-                    score += 1
-                    correct = True
+        score, _, question_results = grade_answers(
+            answer_key, lambda question_id: request.form.get(f'question_{question_id}'))
     
-    new_score = Score(
-        quiz_id=quiz_id,
-        user_id=user_id,
-        time_stamp_of_attempt=datetime.utcnow(),
-        total_scored=score,
-        total_questions=total_questions
-    )
-    
-    db.session.add(new_score)
-    db.session.commit()
+    score_id = record_score(user_id, quiz, answer_key, score, question_results)
+    if score_id is None:
+        existing_score = Score.query.filter_by(user_id=user_id, quiz_id=quiz_id).first()
+        if is_json_requested():
+            return jsonify({
+                'success': False,
+                'message': f'You have already attempted this quiz. You scored {existing_score.total_scored} out of {existing_score.total_questions} questions.'
+            }), 403
+        flash('You have already attempted this quiz!', 'warning')
+        return redirect(url_for('user.quiz_list', chapter_id=quiz.chapter_id))
     
+    remember_attempt(score_id, user_id, quiz_id, question_results)
     percentage = (score / total_questions) * 100 if total_questions > 0 else 0
     
     if is_json_requested() or request.is_json:
         return jsonify({
             'success': True,
-            'score_id': new_score.id,
+            'score_id': score_id,
             'total_scored': score,
             'total_questions': total_questions,
             'percentage': percentage,
-            'question_results': [{'id': q_id, 'correct': correct, 'correct_option': q.correct_option, 'user_answer': ans} for q_id, ans in user_answers.items()]
+            'question_results': question_results
         })
 
-    session['quiz_results'] = {
-        'user_answers': {str(q_id): ans for q_id, ans in user_answers.items()},
-        'score_id': new_score.id
-    }
-    
     return redirect(url_for('user.quiz_result', quiz_id=quiz_id))
 
 @user.route('/quizzes/<int:quiz_id>/result')
@@ -872,25 +1000,24 @@ def quiz_result(quiz_id):
       200:
         description: Quiz result page
       302:
-        description: Redirect to dashboard if no results found
+        description: Redirect to dashboard if the user has not attempted the quiz
       404:
         description: Quiz not found
     """
     user_id = session['user_id']
-    quiz = Quiz.query.get_or_404(quiz_id)
-    
-    quiz_results = session.get('quiz_results', {})
-    user_answers = quiz_results.get('user_answers', {})
-    score_id = quiz_results.get('score_id')
+    quiz = catalog().quizzes.get(quiz_id)
+    if quiz is None:
+        abort(404)
     
-    if not user_answers or not score_id:
+    attempt = find_attempt(user_id, quiz_id)
+    if attempt is None:
         flash('No quiz results found!', 'danger')
         return redirect(url_for('user.dashboard'))
     
-    score = Score.query.get(score_id)
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-    
-    session.pop('quiz_results', None)
+    score = attempt.Score
+    questions = get_question_payload(attempt.quiz).questions
+    answers = attempt_result(score, attempt.quiz)
+    user_answers = {str(question_id): selected for question_id, (selected, _) in answers.items()}
     
     return render_template('user/quizzes/result.html',
                           title=f'Quiz Results: {quiz.title}',
@@ -909,6 +1036,21 @@ def quiz_history():
       - user
     summary: Get user's quiz history
     description: Returns the history of all quizzes attempted by the user
+    parameters:
+      - name: page
+        in: query
+        description: Page of the attempt list to show
+        required: false
+        schema:
+          type: integer
+          default: 1
+      - name: per_page
+        in: query
+        description: Attempts per page (max 100)
+        required: false
+        schema:
+          type: integer
+          default: 20
     responses:
       200:
         description: Quiz history page with statistics
@@ -972,44 +1114,25 @@ def quiz_history():
     user_id = session['user_id']
     user = User.query.get(user_id)
 
-    scores = Score.query.filter_by(user_id=user_id).order_by(Score.time_stamp_of_attempt.desc()).all()
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    query = Score.query.filter_by(user_id=user_id).order_by(Score.time_stamp_of_attempt.desc(), Score.id.desc())
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    scores = prefetch_scores(pagination.items)
     
-    total_quizzes = len(scores)
-    total_questions = sum(score.total_questions for score in scores)
-    total_correct = sum(score.total_scored for score in scores)
+    total_quizzes, total_questions, total_correct = user_score_totals(user_id)
     
     avg_score = 0
     if total_questions > 0:
         avg_score = (total_correct / total_questions) * 100
 
-    subject_performance = {}
-    for score in scores:
-        subject_id = score.quiz.chapter.subject.id
-        subject_name = score.quiz.chapter.subject.name
-        
-        if subject_id not in subject_performance:
-            subject_performance[subject_id] = {
-                'name': subject_name,
-                'total_quizzes': 0,
-                'total_questions': 0,
-                'total_correct': 0,
-                'percentage': 0
-            }
-        
-        subject_performance[subject_id]['total_quizzes'] += 1
-        subject_performance[subject_id]['total_questions'] += score.total_questions
-        subject_performance[subject_id]['total_correct'] += score.total_scored
-
-    for subject_id in subject_performance:
-        total_q = subject_performance[subject_id]['total_questions']
-        total_c = subject_performance[subject_id]['total_correct']
-        if total_q > 0:
-            subject_performance[subject_id]['percentage'] = (total_c / total_q) * 100
+    subject_performance = user_subject_performance(user_id)
     
     return render_template('user/quiz_history.html',
                           title='Quiz History',
                           user=user,
                           scores=scores,
+                          pagination=pagination,
                           total_quizzes=total_quizzes,
                           total_questions=total_questions,
                           total_correct=total_correct,
@@ -1044,22 +1167,106 @@ def quiz_report(quiz_id):
  
     score = Score.query.filter_by(user_id=user_id, quiz_id=quiz_id).first_or_404()
  
-    questions = Question.query.filter_by(quiz_id=quiz_id).all()
-  
-    all_scores = Score.query.filter_by(quiz_id=quiz_id).all()
-    total_attempts = len(all_scores)
- 
-    avg_score = 0
-    if total_attempts > 0:
-        avg_score = sum(s.total_scored for s in all_scores) / (total_attempts * len(questions)) * 100
-    
+    questions = get_question_payload(quiz).questions
+    responses = attempt_result(score, quiz)
+    summary = quiz_summary(quiz_id, len(questions))
+    standing = user_standing(score)
+    leaders = leaderboard(quiz_id)
+        
     return render_template('user/quizzes/report.html',
                           title=f'Quiz Report: {quiz.title}',
                           quiz=quiz,
                           score=score,
                           questions=questions,
-                          total_attempts=total_attempts,
-                          avg_score=avg_score)
+                          responses=responses,
+                          total_attempts=summary['attempts'],
+                          avg_score=summary['avg_score'],
+                          std_dev=summary['std_dev'],
+                          standing=standing,
+                          leaders=leaders)
+
+@user.route('/quizzes/<int:quiz_id>/leaderboard')
+@login_required
+def quiz_leaderboard(quiz_id):
+    """
+    Quiz Leaderboard
+    ---
+    tags:
+      - user
+    summary: Get the top scores of a quiz and the user's rank
+    description: Returns the highest-scoring attempts at a quiz by percentage, earliest first among equal whole percentages, and the current user's rank and percentile among all attempts. Ranks are by whole percentage, so on quizzes of more than 100 questions nearby scores can share a rank.
+    parameters:
+      - name: quiz_id
+        in: path
+        description: ID of the quiz
+        required: true
+        schema:
+          type: integer
+      - name: limit
+        in: query
+        description: Number of top attempts to return (default 10, max 100)
+        required: false
+        type: integer
+    responses:
+      200:
+        description: Leaderboard
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                success:
+                  type: boolean
+                quiz_id:
+                  type: integer
+                leaderboard:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      rank:
+                        type: integer
+                      user_id:
+                        type: integer
+                      full_name:
+                        type: string
+                      total_scored:
+                        type: integer
+                      total_questions:
+                        type: integer
+                      percentage:
+                        type: number
+                      time_stamp_of_attempt:
+                        type: string
+                your_standing:
+                  type: object
+                  description: Null if the user has not attempted the quiz
+                  properties:
+                    rank:
+                      type: integer
+                    attempts:
+                      type: integer
+                    percentile:
+                      type: number
+      404:
+        description: Quiz not found
+    """
+    if catalog().quizzes.get(quiz_id) is None:
+        abort(404)
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    
+    your_standing = None
+    if 'user_id' in session:
+        score = Score.query.filter_by(user_id=session['user_id'], quiz_id=quiz_id).first()
+        if score:
+            your_standing = user_standing(score)
+    
+    return jsonify({
+        'success': True,
+        'quiz_id': quiz_id,
+        'leaderboard': leaderboard(quiz_id, limit),
+        'your_standing': your_standing
+    })
 
 @user.route('/scores')
 @user_required
@@ -1115,7 +1322,7 @@ def user_scores():
         return jsonify({
             'success': True,
             'count': len(scores),
-            'scores': [serialize_score(score) for score in scores]
+            'scores': serialize_scores(scores)
         })
     
     return render_template('user/scores/list.html', 
@@ -1147,6 +1354,20 @@ def search():
           type: string
           enum: [all, subjects, chapters, quizzes]
           default: all
+      - name: page
+        in: query
+        description: Page of results for each content type
+        required: false
+        schema:
+          type: integer
+          default: 1
+      - name: limit
+        in: query
+        description: Results per content type per page (max 100)
+        required: false
+        schema:
+          type: integer
+          default: 20
     responses:
       200:
         description: Search results
@@ -1235,41 +1456,43 @@ def search():
                               chapters=[],
                               quizzes=[])
     
+    page = max(request.args.get('page', 1, type=int), 1)
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    offset = (page - 1) * limit
+    
     subject_results = []
     if search_type in ['all', 'subjects']:
-        subject_results = Subject.query.filter(
-            (Subject.name.ilike(f'%{query}%')) |
-            (Subject.description.ilike(f'%{query}%'))
-        ).all()
+        subject_results = search_models(Subject, query, limit, offset)
     
     chapter_results = []
     if search_type in ['all', 'chapters']:
-        chapter_results = Chapter.query.filter(
-            (Chapter.name.ilike(f'%{query}%')) |
-            (Chapter.description.ilike(f'%{query}%'))
-        ).all()
+        chapter_results = search_models(Chapter, query, limit, offset)
     
     quiz_results = []
     if search_type in ['all', 'quizzes']:
-        quiz_results = Quiz.query.filter(
-            (Quiz.title.ilike(f'%{query}%')) |
-            (Quiz.remarks.ilike(f'%{query}%'))
-        ).all()
+        quiz_results = search_models(Quiz, query, limit, offset)
     
+    user_scores = get_user_scores(session['user_id'], [quiz.id for quiz in quiz_results])
+
     if is_json_requested():
         return jsonify({
             'success': True,
             'query': query,
             'search_type': search_type,
-            'subjects': [serialize_subject(subject) for subject in subject_results],
-            'chapters': [serialize_chapter(chapter) for chapter in chapter_results],
-            'quizzes': [serialize_quiz(quiz) for quiz in quiz_results]
+            'page': page,
+            'limit': limit,
+            'subjects': serialize_subjects(subject_results),
+            'chapters': serialize_chapters(chapter_results),
+            'quizzes': serialize_quizzes(quiz_results, session['user_id'], user_scores)
         })
     
     return render_template('user/search/results.html', 
                           title='Search Results',
                           query=query,
                           search_type=search_type,
+                          page=page,
+                          limit=limit,
                           subjects=subject_results,
-                          chapters=chapter_results,
-                          quizzes=quiz_results) 
\ No newline at end of file
+                          chapters=prefetch_chapters(chapter_results),
+                          quizzes=prefetch_quizzes(quiz_results),
+                          attempted_quiz_ids=set(user_scores)) 
\ No newline at end of file
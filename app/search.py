@@ -0,0 +1,123 @@
+import re
+import string
+import weakref
+from sqlalchemy import func, text
+from app.models.models import db, User, Subject, Chapter, Quiz, Question
+
+# Searchable columns per model. Each model gets an external-content FTS5 table
+# named <table>_fts whose rowid is the model's id, kept in sync by triggers.
+SEARCHABLE_COLUMNS = {
+    Subject: ('name', 'description'),
+    Chapter: ('name', 'description'),
+    Quiz: ('title', 'remarks'),
+    Question: ('question_statement', 'option1', 'option2', 'option3', 'option4'),
+    User: ('full_name', 'username'),
+}
+
+# Typeahead targets: the model and the columns matched by prefix. Each column
+# has a lower(column) expression index so a prefix becomes an index range scan.
+SUGGEST_COLUMNS = {
+    'subjects': (Subject, ('name',)),
+    'chapters': (Chapter, ('name',)),
+    'quizzes': (Quiz, ('title',)),
+    'users': (User, ('full_name', 'username')),
+}
+
+# SQLite's lower() folds only A-Z, so prefixes are folded the same way; str.lower() would turn
+# 'Éco' into 'éco', which never matches the indexed lower('Économie') = 'Économie'
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+_ready_engines = weakref.WeakSet()
+
+def _fts_table(model):
+    return f'{model.__tablename__}_fts'
+
+def _schema_statements(model):
+    """DDL for a model's FTS5 table and the triggers that keep it in sync"""
+    table = f'"{model.__tablename__}"'
+    fts = _fts_table(model)
+    columns = SEARCHABLE_COLUMNS[model]
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    insert_new = f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});"
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column_list}, content={table}, "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_list} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+def ensure_search_index():
+    """Create the FTS5 tables and triggers if this database does not have them yet"""
+    engine = db.engine
+    if engine in _ready_engines:
+        return
+
+    existing = {row[0] for row in db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'"))}
+    missing = [model for model in SEARCHABLE_COLUMNS if _fts_table(model) not in existing]
+    for model in missing:
+        for statement in _schema_statements(model):
+            db.session.execute(text(statement))
+        db.session.execute(text(f"INSERT INTO {_fts_table(model)}({_fts_table(model)}) VALUES ('rebuild')"))
+    db.session.commit()
+    _ready_engines.add(engine)
+
+def rebuild_search_index():
+    """Rebuild every FTS5 table from its content table"""
+    ensure_search_index()
+    for model in SEARCHABLE_COLUMNS:
+        db.session.execute(text(f"INSERT INTO {_fts_table(model)}({_fts_table(model)}) VALUES ('rebuild')"))
+    db.session.commit()
+
+def to_match_expression(query):
+    """Turn free text into an FTS5 expression matching every word as a prefix"""
+    words = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{word}"*' for word in words)
+
+def search_ids(model, query, limit, offset=0):
+    """Return ids of the best matching rows of model, ordered by bm25 rank"""
+    match = to_match_expression(query)
+    if not match:
+        return []
+
+    ensure_search_index()
+    fts = _fts_table(model)
+    rows = db.session.execute(
+        text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match ORDER BY rank LIMIT :limit OFFSET :offset"),
+        {'match': match, 'limit': limit, 'offset': offset}
+    )
+    return [row[0] for row in rows]
+
+def search_models(model, query, limit, offset=0):
+    """Return the best matching model instances in rank order"""
+    ids = search_ids(model, query, limit, offset)
+    if not ids:
+        return []
+    found = {obj.id: obj for obj in model.query.filter(model.id.in_(ids)).all()}
+    return [found[id] for id in ids if id in found]
+
+def suggest(kind, prefix, limit=10):
+    """Return up to limit {id, label} matches whose column starts with prefix, ignoring ASCII case"""
+    model, columns = SUGGEST_COLUMNS[kind]
+    prefix = (prefix or '').strip().translate(_ASCII_LOWER)
+    if not prefix:
+        return []
+
+    # Every string starting with prefix sorts in [prefix, upper_bound)
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    matches = {}
+    for name in columns:
+        column = getattr(model, name)
+        key = func.lower(column)
+        query = db.session.query(model.id, column, key).filter(key >= prefix, key < upper_bound)
+        for row_id, label, sort_key in query.order_by(key, model.id).limit(limit):
+            matches.setdefault(row_id, (sort_key, label))
+
+    ordered = sorted(matches.items(), key=lambda item: (item[1][0], item[0]))[:limit]
+    return [{'id': row_id, 'label': label} for row_id, (sort_key, label) in ordered]
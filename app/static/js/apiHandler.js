@@ -1,29 +1,99 @@
 const API = {
+    // GET responses by URL: { data, etag, fetchedAt }. Entries younger than cacheTtl are served
+    // without a request; older ones are revalidated with If-None-Match and reused on a 304.
+    cache: new Map(),
+    cacheTtl: 10000,
+    // Pending GETs by URL, so concurrent callers share one request
+    inflight: new Map(),
+    // Bumped by clearCache(); responses to requests sent before a clear are not cached
+    cacheGeneration: 0,
+
     async fetch(endpoint, options = {}) {
+        const url = endpoint.includes('?') 
+            ? `${endpoint}&format=json`
+            : `${endpoint}?format=json`;
+        const method = (options.method || 'GET').toUpperCase();
+
+        if (method !== 'GET') {
+            const { data } = await this.send(url, options);
+            // Any successful write can change what the cached GETs return
+            this.clearCache();
+            return data;
+        }
+
+        const cached = this.cache.get(url);
+        if (cached && Date.now() - cached.fetchedAt < this.cacheTtl) {
+            return cached.data;
+        }
+
+        if (this.inflight.has(url)) {
+            return this.inflight.get(url);
+        }
+
+        const generation = this.cacheGeneration;
+        const headers = cached && cached.etag ? { 'If-None-Match': cached.etag } : {};
+        const request = this.send(url, { ...options, headers: { ...headers, ...options.headers } })
+            .then(({ response, data }) => {
+                if (response.status === 304) {
+                    cached.fetchedAt = Date.now();
+                    return cached.data;
+                }
+                if (generation === this.cacheGeneration) {
+                    this.cache.set(url, { data, etag: response.headers.get('ETag'), fetchedAt: Date.now() });
+                }
+                return data;
+            })
+            .finally(() => {
+                if (this.inflight.get(url) === request) {
+                    this.inflight.delete(url);
+                }
+            });
+
+        this.inflight.set(url, request);
+        return request;
+    },
+
+    async send(url, options = {}) {
         try {
-            const url = endpoint.includes('?') 
-                ? `${endpoint}&format=json`
-                : `${endpoint}?format=json`;
-                
             const response = await fetch(url, {
+                ...options,
                 headers: {
-                    'Accept': 'application/json'
-                },
-                ...options
+                    'Accept': 'application/json',
+                    ...options.headers
+                }
             });
-            
+
+            if (response.status === 304) {
+                return { response, data: null };
+            }
+
             const data = await response.json();
             
             if (!response.ok) {
                 throw new Error(data.message || 'Something went wrong');
             }
             
-            return data;
+            return { response, data };
         } catch (error) {
             console.error('API Error:', error);
             throw error;
         }
     },
+
+    // Drop cached GETs whose path starts with prefix, or all of them
+    clearCache(prefix = '') {
+        this.cacheGeneration++;
+        for (const url of this.inflight.keys()) {
+            if (url.startsWith(prefix)) {
+                this.inflight.delete(url);
+            }
+        }
+        for (const url of this.cache.keys()) {
+            if (url.startsWith(prefix)) {
+                this.cache.delete(url);
+            }
+        }
+    },
     
     getSubjects() {
         return this.fetch('/user/subjects');
@@ -48,7 +118,16 @@ const API = {
     getQuiz(quizId) {
         return this.fetch(`/user/quizzes/${quizId}`);
     },
-    
+
+    getCatalogTree({ subjectId, chapterId, depth } = {}) {
+        const params = new URLSearchParams();
+        if (subjectId !== undefined) params.set('subject_id', subjectId);
+        if (chapterId !== undefined) params.set('chapter_id', chapterId);
+        if (depth !== undefined) params.set('depth', depth);
+        const query = params.toString();
+        return this.fetch(query ? `/user/catalog?${query}` : '/user/catalog');
+    },
+
     getQuizQuestions(quizId) {
         return this.fetch(`/user/quizzes/${quizId}/questions`);
     },
@@ -74,6 +153,19 @@ const API = {
     getDashboard() {
         return this.fetch('/user/dashboard');
     },
+
+    // Run several GETs (paths under /user/ or /admin/) in one round-trip; resolves to their results in order
+    async batch(paths) {
+        // Read-only, so it goes straight to send() and leaves the cache alone
+        const { data } = await this.send('/api/batch?format=json', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ requests: paths })
+        });
+        return data.responses;
+    },
     
     admin: {
         getDashboard() {
@@ -0,0 +1,132 @@
+from itertools import accumulate
+from sqlalchemy import insert, select, update
+from app.models.models import db, User, Score, QuizStats, score_percent
+
+# Per-quiz score statistics kept in QuizStats, so reports read one row instead of every Score.
+# Scores are bucketed by whole percentage: bucket n counts attempts that scored at least n% and less
+# than n + 1% (bucket 100 is a perfect score). Ranks are whole-percentage ranks: on a quiz of more than
+# 100 questions, or across attempts graded against different question counts, scores within the same
+# percentage point share a rank.
+
+HISTOGRAM_BUCKETS = 101
+
+def score_bucket(total_scored, total_questions):
+    """The histogram bucket of a score"""
+    if not total_questions:
+        return 0
+    return min(total_scored * 100 // total_questions, HISTOGRAM_BUCKETS - 1)
+
+def add_attempt(quiz_id, total_scored, total_questions):
+    """
+    Count one attempt in the quiz's QuizStats row. Call in the transaction that inserts the Score, after
+    the insert: the write lock it holds keeps other submissions from changing the histogram in between.
+    """
+    bucket = score_bucket(total_scored, total_questions)
+    query = select(QuizStats.histogram).where(QuizStats.quiz_id == quiz_id).with_for_update()
+    row = db.session.execute(query).first()
+    if row is None:
+        histogram = [0] * HISTOGRAM_BUCKETS
+        histogram[bucket] = 1
+        db.session.execute(insert(QuizStats).values(
+            quiz_id=quiz_id,
+            attempts=1,
+            score_sum=total_scored,
+            score_sq_sum=total_scored * total_scored,
+            histogram=histogram
+        ))
+        return
+
+    histogram = list(row.histogram)
+    histogram[bucket] += 1
+    db.session.execute(update(QuizStats).where(QuizStats.quiz_id == quiz_id).values(
+        attempts=QuizStats.attempts + 1,
+        score_sum=QuizStats.score_sum + total_scored,
+        score_sq_sum=QuizStats.score_sq_sum + total_scored * total_scored,
+        histogram=histogram
+    ))
+
+def quiz_summary(quiz_id, question_count):
+    """Attempts, average percentage and percentage standard deviation of a quiz's scores"""
+    stats = db.session.get(QuizStats, quiz_id)
+    if stats is None or not stats.attempts or not question_count:
+        return {'attempts': stats.attempts if stats else 0, 'avg_score': 0, 'std_dev': 0}
+    mean = stats.score_sum / stats.attempts
+    variance = max(stats.score_sq_sum / stats.attempts - mean * mean, 0)
+    return {
+        'attempts': stats.attempts,
+        'avg_score': mean / question_count * 100,
+        'std_dev': variance ** 0.5 / question_count * 100
+    }
+
+def standing(histogram, bucket):
+    """
+    Rank and percentile of a score in bucket, from a histogram alone: rank counts attempts in higher
+    buckets (equal scores share a rank), percentile is the share scoring below plus half of the ties
+    """
+    attempts = sum(histogram)
+    if not attempts:
+        return None
+    above = sum(histogram[bucket + 1:])
+    below = attempts - above - histogram[bucket]
+    return {
+        'rank': above + 1,
+        'attempts': attempts,
+        'percentile': round((below + histogram[bucket] / 2) / attempts * 100, 1)
+    }
+
+def user_standing(score):
+    """The rank and percentile of a Score among all attempts at its quiz"""
+    stats = db.session.get(QuizStats, score.quiz_id)
+    if stats is None:
+        return None
+    return standing(stats.histogram, score_bucket(score.total_scored, score.total_questions))
+
+def leaderboard(quiz_id, limit=10):
+    """
+    The quiz's top attempts, read in ix_score_quiz_standing order: by percentage bucket, then earliest
+    attempt. Ranks come from the same buckets in the histogram, so they agree with user_standing()
+    and never decrease down the list, even if the quiz's question count changed between attempts.
+    """
+    stats = db.session.get(QuizStats, quiz_id)
+    if stats is None:
+        return []
+    # attempts_above[n]: attempts in buckets higher than n
+    attempts_above = list(accumulate(reversed(stats.histogram), initial=0))[::-1][1:]
+
+    query = db.session.query(Score.user_id, User.full_name, Score.total_scored, Score.total_questions,
+                             Score.time_stamp_of_attempt)
+    query = query.join(User, User.id == Score.user_id).filter(Score.quiz_id == quiz_id)
+    percent = score_percent(Score.total_scored, Score.total_questions)
+    query = query.order_by(percent.desc(), Score.time_stamp_of_attempt).limit(limit)
+    return [
+        {
+            'rank': attempts_above[score_bucket(total_scored, total_questions)] + 1,
+            'user_id': user_id,
+            'full_name': full_name,
+            'total_scored': total_scored,
+            'total_questions': total_questions,
+            'percentage': total_scored / total_questions * 100 if total_questions else 0,
+            'time_stamp_of_attempt': time_stamp.isoformat() if time_stamp else None
+        }
+        for user_id, full_name, total_scored, total_questions, time_stamp in query
+    ]
+
+def rebuild_quiz_stats():
+    """Recompute every QuizStats row from the Score table"""
+    totals = {}
+    query = db.session.query(Score.quiz_id, Score.total_scored, Score.total_questions)
+    for quiz_id, total_scored, total_questions in query.yield_per(10000):
+        stats = totals.get(quiz_id)
+        if stats is None:
+            stats = totals[quiz_id] = {'quiz_id': quiz_id, 'attempts': 0, 'score_sum': 0, 'score_sq_sum': 0,
+                                       'histogram': [0] * HISTOGRAM_BUCKETS}
+        stats['attempts'] += 1
+        stats['score_sum'] += total_scored
+        stats['score_sq_sum'] += total_scored * total_scored
+        stats['histogram'][score_bucket(total_scored, total_questions)] += 1
+
+    db.session.query(QuizStats).delete()
+    if totals:
+        db.session.execute(insert(QuizStats), list(totals.values()))
+    db.session.commit()
+    return len(totals)
@@ -0,0 +1,230 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Bundle
+from app.models.models import db, Quiz, Score, Response
+from app.analytics import pack_answers, attempt_answers
+from app.cache import LRUCache, get_answer_key
+from app.stats import add_attempt
+
+# The quiz submit path. The unique (user_id, quiz_id) index on Score is the duplicate check: the attempt is
+# inserted without looking for an earlier one, and the IntegrityError from a repeat attempt is the answer.
+
+def submit_target(quiz_id):
+    """The id, chapter_id and questions_version of a quiz, or None; enough to grade and record an attempt"""
+    return db.session.query(Quiz.id, Quiz.chapter_id, Quiz.questions_version).filter_by(id=quiz_id).first()
+
+def _score_values(user_id, quiz_id, total_scored, total_questions):
+    return {
+        'quiz_id': quiz_id,
+        'user_id': user_id,
+        'time_stamp_of_attempt': datetime.utcnow(),
+        'total_scored': total_scored,
+        'total_questions': total_questions
+    }
+
+def _is_repeat_attempt(error):
+    """Whether an IntegrityError is the uq_score_user_quiz violation, which SQLite reports by its columns"""
+    message = str(error.orig)
+    return 'uq_score_user_quiz' in message or 'score.user_id, score.quiz_id' in message
+
+def _insert_attempt(values, question_results):
+    """
+    Insert one attempt, its Response rows and its QuizStats update in the current transaction,
+    returning the score id, or None for a repeat attempt
+    """
+    try:
+        result = db.session.execute(insert(Score).values(**values))
+    except IntegrityError as error:
+        if not _is_repeat_attempt(error):
+            raise
+        # SQLite undoes only the failed statement, so the rest of the transaction is unaffected
+        return None
+    score_id = result.inserted_primary_key[0]
+    add_attempt(values['quiz_id'], values['total_scored'], values['total_questions'])
+    if question_results:
+        # One executemany for every answered question
+        db.session.execute(insert(Response), [
+            {
+                'score_id': score_id,
+                'question_id': question['id'],
+                'selected_option': question['user_answer'],
+                'is_correct': question['correct']
+            }
+            for question in question_results
+        ])
+    return score_id
+
+def record_score(user_id, quiz, answer_key, total_scored, question_results=()):
+    """
+    Insert and commit an attempt graded against answer_key. grade_answers()' question_results are kept
+    as Response rows, or packed into the Score row when RESPONSE_STORAGE is 'packed'.
+    Returns the new score id, or None if the user already attempted the quiz.
+    """
+    values = _score_values(user_id, quiz.id, total_scored, len(answer_key))
+    if current_app.config['RESPONSE_STORAGE'] == 'packed':
+        values['answers'] = pack_answers(answer_key, question_results)
+        values['answers_version'] = quiz.questions_version
+        question_results = ()
+    writer = current_app.extensions.get('submission_writer')
+    if writer is not None:
+        # End the request's read-only transaction so its pooled connection is free while it waits
+        db.session.commit()
+        return writer.submit(values, question_results)
+
+    score_id = _insert_attempt(values, question_results)
+    if score_id is None:
+        db.session.rollback()
+        return None
+    # The id comes from the INSERT itself, so nothing is reloaded after the commit
+    db.session.commit()
+    return score_id
+
+def remember_attempt(score_id, user_id, quiz_id, question_results):
+    """Keep a just-recorded attempt's graded answers for its result page"""
+    answers = {result['id']: (result['user_answer'], result['correct']) for result in question_results}
+    current_app.extensions['attempt_results'].set(score_id, (user_id, quiz_id, answers))
+
+def find_attempt(user_id, quiz_id):
+    """
+    The user's attempt at a quiz as a row of (Score, quiz), where quiz holds the id, chapter_id and
+    questions_version needed to rebuild the result; one lookup on the unique (user_id, quiz_id) index
+    """
+    quiz = Bundle('quiz', Quiz.id, Quiz.chapter_id, Quiz.questions_version)
+    query = db.session.query(Score, quiz).join(Quiz, Score.quiz_id == Quiz.id)
+    return query.filter(Score.user_id == user_id, Score.quiz_id == quiz_id).first()
+
+def attempt_result(score, quiz):
+    """{question_id: (selected_option, is_correct)} for an attempt, from the result store or the database"""
+    results = current_app.extensions['attempt_results']
+    # SQLite can hand a deleted score's id to a later attempt, so entries carry whose attempt they are
+    cached = results.get(score.id)
+    if cached and cached[:2] == (score.user_id, score.quiz_id):
+        return cached[2]
+    answers = attempt_answers(score, quiz, get_answer_key(quiz))
+    results.set(score.id, (score.user_id, score.quiz_id, answers))
+    return answers
+
+class _PendingAttempt:
+    __slots__ = ('values', 'question_results', 'done', 'score_id', 'error', 'claimed', 'cancelled')
+
+    def __init__(self, values, question_results):
+        self.values = values
+        self.question_results = question_results
+        self.done = threading.Event()
+        self.score_id = None
+        self.error = None
+        # Set under SubmissionWriter._claim_lock: claimed once the writer takes it into a batch,
+        # cancelled if submit() gave up on it first
+        self.claimed = False
+        self.cancelled = False
+
+class SubmissionWriter:
+    """
+    Group commit for quiz attempts. Request threads hand their graded attempt to submit() and block;
+    a background thread collects whatever arrives within interval seconds (up to max_batch attempts)
+    and writes it in one transaction, so a burst of submissions costs a few commits instead of one each.
+    submit() returns only after the attempt's batch has committed. An attempt still queued after
+    timeout seconds is cancelled and never written, so the caller's error is the attempt's outcome;
+    one the writer has already taken is waited for instead.
+    """
+    def __init__(self, app, interval, max_batch, timeout):
+        self.app = app
+        self.interval = interval
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._claim_lock = threading.Lock()
+
+    def submit(self, values, question_results=()):
+        self._ensure_started()
+        pending = _PendingAttempt(values, question_results)
+        self._queue.put(pending)
+        if not pending.done.wait(self.timeout):
+            with self._claim_lock:
+                pending.cancelled = not pending.claimed
+            if pending.cancelled:
+                raise TimeoutError('Timed out waiting for the submission writer; the attempt was not recorded')
+            # Already in a batch being written, so its outcome is moments away
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.score_id
+
+    def _ensure_started(self):
+        # Started on first use, and again in a forked worker, which does not inherit the parent's thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            with self.app.app_context():
+                self._write(batch)
+
+    def _write(self, batch):
+        with self._claim_lock:
+            batch = [pending for pending in batch if not pending.cancelled]
+            for pending in batch:
+                pending.claimed = True
+        if not batch:
+            return
+        try:
+            for pending in batch:
+                pending.score_id = _insert_attempt(pending.values, pending.question_results)
+            db.session.commit()
+        except Exception as error:
+            db.session.rollback()
+            self.app.logger.exception('Submission batch of %d failed', len(batch))
+            for pending in batch:
+                pending.score_id = None
+                pending.error = error
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+def init_submissions(app):
+    """Set the submission defaults and create the submission writer when SUBMISSION_WRITER is enabled"""
+    app.config.setdefault('RESPONSE_STORAGE', 'rows')
+    app.config.setdefault('ATTEMPT_RESULT_CACHE_SIZE', 1024)
+    app.extensions['attempt_results'] = LRUCache(app.config['ATTEMPT_RESULT_CACHE_SIZE'])
+    app.config.setdefault('SUBMISSION_WRITER', False)
+    app.config.setdefault('SUBMISSION_WRITER_INTERVAL', 0.005)
+    app.config.setdefault('SUBMISSION_WRITER_MAX_BATCH', 200)
+    # Seconds a submission may wait in the writer's queue; past it the attempt is dropped unwritten
+    # and the request fails, so a retry is a fresh attempt rather than a duplicate
+    app.config.setdefault('SUBMISSION_WRITER_TIMEOUT', 30)
+    if app.config['SUBMISSION_WRITER']:
+        app.extensions['submission_writer'] = SubmissionWriter(
+            app,
+            app.config['SUBMISSION_WRITER_INTERVAL'],
+            app.config['SUBMISSION_WRITER_MAX_BATCH'],
+            app.config['SUBMISSION_WRITER_TIMEOUT']
+        )
@@ -1,6 +1,10 @@
-from flask import request, jsonify, session
+from flask import request, jsonify, session, current_app, make_response
 from datetime import datetime
 from functools import wraps
+import hashlib
+from sqlalchemy import func
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.models import db, Subject, Chapter, Quiz, Question, Score
 
 def is_json_requested():
     """Check if JSON response is requested instead of HTML"""
@@ -8,65 +12,284 @@ def is_json_requested():
         return True
     return request.args.get('format') == 'json'
 
+def _chunked(ids, size=500):
+    """Split ids into chunks that stay below SQLite's bound parameter limit"""
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+def count_by(column, ids):
+    """Count rows grouped by a foreign key column, returning {parent_id: count}"""
+    counts = {}
+    for chunk in _chunked(set(ids)):
+        rows = db.session.query(column, func.count()).filter(column.in_(chunk)).group_by(column).all()
+        counts.update(rows)
+    return counts
+
+def _attach_parents(children, fk_name, relationship_name, model):
+    """Load the parents of a list of models in one query and set them as already-loaded relationships"""
+    ids = {getattr(child, fk_name) for child in children}
+    parents = {}
+    for chunk in _chunked(ids):
+        for parent in model.query.filter(model.id.in_(chunk)).all():
+            parents[parent.id] = parent
+
+    for child in children:
+        set_committed_value(child, relationship_name, parents.get(getattr(child, fk_name)))
+    return list(parents.values())
+
+def adjust_count(column, row_id, delta):
+    """Atomically add delta to a denormalized counter column such as Subject.chapters_count"""
+    if row_id is None or not delta:
+        return
+    column.class_.query.filter_by(id=row_id).update({column: column + delta})
+
+def repair_counts():
+    """Recompute every denormalized counter column from the child tables"""
+    counters = [
+        (Subject, Subject.chapters_count, Chapter, Chapter.subject_id),
+        (Chapter, Chapter.quizzes_count, Quiz, Quiz.chapter_id),
+        (Quiz, Quiz.questions_count, Question, Question.quiz_id),
+    ]
+    for parent, counter, child, foreign_key in counters:
+        actual = db.session.query(func.count(child.id)).filter(foreign_key == parent.id).scalar_subquery()
+        db.session.query(parent).update({counter: actual}, synchronize_session=False)
+    db.session.commit()
+
+def prefetch_chapters(chapters):
+    """Load the subject of every Chapter in a list"""
+    _attach_parents(chapters, 'subject_id', 'subject', Subject)
+    return chapters
+
+def prefetch_quizzes(quizzes):
+    """Load the chapter and subject of every Quiz in a list"""
+    chapters = _attach_parents(quizzes, 'chapter_id', 'chapter', Chapter)
+    _attach_parents(chapters, 'subject_id', 'subject', Subject)
+    return quizzes
+
+def prefetch_scores(scores):
+    """Load the quiz, chapter and subject of every Score in a list"""
+    quizzes = _attach_parents(scores, 'quiz_id', 'quiz', Quiz)
+    chapters = _attach_parents(quizzes, 'chapter_id', 'chapter', Chapter)
+    _attach_parents(chapters, 'subject_id', 'subject', Subject)
+    return scores
+
+def prefetch_questions(questions):
+    """Load the quiz of every Question in a list"""
+    _attach_parents(questions, 'quiz_id', 'quiz', Quiz)
+    return questions
+
+def prefetch_users(users):
+    """Attach scores_count to every User in a list"""
+    counts = count_by(Score.user_id, [u.id for u in users])
+    for user in users:
+        user.scores_count = counts.get(user.id, 0)
+    return users
+
+class KeysetPage:
+    """One page of rows ordered by primary key, with cursors for the neighbouring pages"""
+    def __init__(self, items, limit, next_after=None, prev_before=None):
+        self.items = items
+        self.limit = limit
+        self.next_after = next_after
+        self.prev_before = prev_before
+
+    def to_dict(self):
+        """Cursor metadata included in paginated JSON responses"""
+        return {
+            'limit': self.limit,
+            'next_after': self.next_after,
+            'prev_before': self.prev_before,
+            'has_more': self.next_after is not None
+        }
+
+def keyset_paginate(query, model, default_limit=50, max_limit=500):
+    """
+    Return a KeysetPage of query using the limit, after and before request args.
+    Rows are seeked by primary key, so deep pages cost the same as the first one.
+    """
+    limit = max(1, min(request.args.get('limit', default_limit, type=int), max_limit))
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+
+    if before is not None:
+        rows = query.filter(model.id < before).order_by(model.id.desc()).limit(limit + 1).all()
+        items = list(reversed(rows[:limit]))
+        has_prev = len(rows) > limit
+        # The before row itself may have been deleted, so look for anything past this page
+        has_next = bool(items) and query.with_entities(model.id).filter(model.id > items[-1].id).first() is not None
+    else:
+        if after is not None:
+            query = query.filter(model.id > after)
+        rows = query.order_by(model.id).limit(limit + 1).all()
+        items = rows[:limit]
+        has_prev = after is not None
+        has_next = len(rows) > limit
+
+    return KeysetPage(
+        items,
+        limit,
+        next_after=items[-1].id if items and has_next else None,
+        prev_before=items[0].id if items and has_prev else None
+    )
+
+def get_user_scores(user_id, quiz_ids):
+    """Return the user's Score for each of the given quizzes, keyed by quiz_id"""
+    scores = {}
+    for chunk in _chunked(set(quiz_ids)):
+        for score in Score.query.filter(Score.user_id == user_id, Score.quiz_id.in_(chunk)).all():
+            scores[score.quiz_id] = score
+    return scores
+
+def attempted_quiz_ids(user_id):
+    """Ids of every quiz the user has attempted, read from the (user_id, quiz_id) index"""
+    return {quiz_id for (quiz_id,) in db.session.query(Score.quiz_id).filter(Score.user_id == user_id)}
+
+def subjects_with_counts():
+    """Return (subject, chapter_count, quiz_count) for every Subject from one grouped join"""
+    query = db.session.query(Subject, func.count(func.distinct(Chapter.id)), func.count(Quiz.id))
+    query = query.outerjoin(Chapter, Chapter.subject_id == Subject.id).outerjoin(Quiz, Quiz.chapter_id == Chapter.id)
+    return query.group_by(Subject.id).order_by(Subject.id).all()
+
+def user_score_totals(user_id):
+    """Return (attempts, total_questions, total_correct) over all of a user's scores"""
+    attempts, total_questions, total_correct = db.session.query(
+        func.count(Score.id),
+        func.coalesce(func.sum(Score.total_questions), 0),
+        func.coalesce(func.sum(Score.total_scored), 0)
+    ).filter(Score.user_id == user_id).one()
+    return attempts, total_questions, total_correct
+
+def user_subject_performance(user_id):
+    """Roll a user's scores up per subject with one grouped join across Score -> Quiz -> Chapter -> Subject"""
+    query = db.session.query(
+        Subject.id,
+        Subject.name,
+        func.count(Score.id),
+        func.sum(Score.total_questions),
+        func.sum(Score.total_scored)
+    )
+    query = query.join(Chapter, Chapter.subject_id == Subject.id).join(Quiz, Quiz.chapter_id == Chapter.id)
+    query = query.join(Score, Score.quiz_id == Quiz.id).filter(Score.user_id == user_id)
+    rows = query.group_by(Subject.id, Subject.name).order_by(Subject.name).all()
+
+    performance = {}
+    for subject_id, name, total_quizzes, total_questions, total_correct in rows:
+        performance[subject_id] = {
+            'name': name,
+            'total_quizzes': total_quizzes,
+            'total_questions': total_questions,
+            'total_correct': total_correct,
+            'percentage': (total_correct / total_questions) * 100 if total_questions > 0 else 0
+        }
+    return performance
+
+def grade_answers(answer_key, answer_for):
+    """
+    Grade a submission against an answer key of (question_id, correct_option) pairs.
+    answer_for(question_id) returns the submitted option, or None if the question was skipped.
+    Returns (score, user_answers, question_results) covering the answered questions.
+    """
+    score = 0
+    user_answers = {}
+    question_results = []
+    for question_id, correct_option in answer_key:
+        answer = answer_for(question_id)
+        if answer is None:
+            continue
+        user_answer = int(answer)
+        correct = user_answer == correct_option
+        score += correct
+        user_answers[question_id] = user_answer
+        question_results.append({
+            'id': question_id,
+            'correct': correct,
+            'correct_option': correct_option,
+            'user_answer': user_answer
+        })
+    return score, user_answers, question_results
+
 def serialize_subject(subject):
     """Serialize a Subject model to a dictionary"""
-    return {
+    return serialize_subjects([subject])[0]
+
+def serialize_subjects(subjects):
+    """Serialize a list of Subject models using a constant number of queries"""
+    return [{
         'id': subject.id,
         'name': subject.name,
         'description': subject.description,
         'created_at': subject.created_at.isoformat() if subject.created_at else None,
-        'chapters_count': len(subject.chapters)
-    }
+        'chapters_count': subject.chapters_count
+    } for subject in subjects]
 
 def serialize_chapter(chapter):
     """Serialize a Chapter model to a dictionary"""
-    return {
+    return serialize_chapters([chapter])[0]
+
+def serialize_chapters(chapters, prefetch=True):
+    """Serialize a list of Chapter models using a constant number of queries; pass prefetch=False for catalog records"""
+    if prefetch:
+        prefetch_chapters(chapters)
+    return [{
         'id': chapter.id,
         'name': chapter.name,
         'description': chapter.description,
         'subject_id': chapter.subject_id,
         'subject_name': chapter.subject.name,
         'created_at': chapter.created_at.isoformat() if chapter.created_at else None,
-        'quizzes_count': len(chapter.quizzes)
+        'quizzes_count': chapter.quizzes_count
+    } for chapter in chapters]
+
+def _serialize_user_score(user_score):
+    """Serialize the current user's Score embedded in a quiz dictionary"""
+    if user_score is None:
+        return None
+    return {
+        'score_id': user_score.id,
+        'total_scored': user_score.total_scored,
+        'total_questions': user_score.total_questions,
+        'percentage': (user_score.total_scored / user_score.total_questions * 100) if user_score.total_questions > 0 else 0,
+        'attempt_date': user_score.time_stamp_of_attempt.isoformat() if user_score.time_stamp_of_attempt else None
     }
 
-def serialize_quiz(quiz, user_id=None):
+def serialize_quiz(quiz, user_id=None, user_scores=None):
     """Serialize a Quiz model to a dictionary"""
-    from app.models.models import score
-    attempted = False
-    score = None
+    return serialize_quizzes([quiz], user_id, user_scores)[0]
 
-    if user_id:
-        user_score = Score.query.filter_by(quiz_id=quiz.id, user_id=user_id).first()
-        attempted = user_score is not None
-        
-        if attempted and user_score:
-            score = {
-                'score_id': user_score.id,
-                'total_scored': user_score.total_scored,
-                'total_questions': user_score.total_questions,
-                'percentage': (user_score.total_scored / user_score.total_questions * 100) if user_score.total_questions > 0 else 0,
-                'attempt_date': user_score.time_stamp_of_attempt.isoformat() if user_score.time_stamp_of_attempt else None
-            }
-    
-    return {
-        'id': quiz.id,
-        'title': quiz.title,
-        'date_of_quiz': quiz.date_of_quiz.isoformat() if quiz.date_of_quiz else None,
-        'time_duration': quiz.time_duration,
-        'availability_window': quiz.get_availability_window(),
-        'remarks': quiz.remarks,
-        'created_at': quiz.created_at.isoformat() if quiz.created_at else None,
-        'is_available': quiz.is_available(),
-        'is_upcoming': quiz.date_of_quiz > datetime.utcnow().date() if quiz.date_of_quiz else False,
-        'chapter_id': quiz.chapter_id,
-        'chapter_name': quiz.chapter.name,
-        'subject_id': quiz.chapter.subject_id,
-        'subject_name': quiz.chapter.subject.name,
-        'questions_count': len(quiz.questions),
-        'attempted': attempted,
-        'score': score
-    }
+def serialize_quizzes(quizzes, user_id=None, user_scores=None, prefetch=True):
+    """
+    Serialize a list of Quiz models; pass user_scores from get_user_scores to reuse an earlier lookup
+    and prefetch=False for catalog records, which already link to their chapter and subject
+    """
+    if prefetch:
+        prefetch_quizzes(quizzes)
+    if user_scores is None:
+        user_scores = get_user_scores(user_id, [q.id for q in quizzes]) if user_id else {}
+    today = datetime.utcnow().date()
+
+    result = []
+    for quiz in quizzes:
+        user_score = user_scores.get(quiz.id)
+        result.append({
+            'id': quiz.id,
+            'title': quiz.title,
+            'date_of_quiz': quiz.date_of_quiz.isoformat() if quiz.date_of_quiz else None,
+            'time_duration': quiz.time_duration,
+            'availability_window': quiz.get_availability_window(),
+            'remarks': quiz.remarks,
+            'created_at': quiz.created_at.isoformat() if quiz.created_at else None,
+            'is_available': quiz.is_available(),
+            'is_upcoming': quiz.date_of_quiz > today if quiz.date_of_quiz else False,
+            'chapter_id': quiz.chapter_id,
+            'chapter_name': quiz.chapter.name,
+            'subject_id': quiz.chapter.subject_id,
+            'subject_name': quiz.chapter.subject.name,
+            'questions_count': quiz.questions_count,
+            'attempted': user_score is not None,
+            'score': _serialize_user_score(user_score)
+        })
+    return result
 
 def serialize_question(question, include_correct_answer=False):
     """Serialize a Question model to a dictionary"""
@@ -88,7 +311,12 @@ def serialize_question(question, include_correct_answer=False):
 
 def serialize_score(score):
     """Serialize a Score model to a dictionary"""
-    return {
+    return serialize_scores([score])[0]
+
+def serialize_scores(scores):
+    """Serialize a list of Score models using a constant number of queries"""
+    prefetch_scores(scores)
+    return [{
         'id': score.id,
         'quiz_id': score.quiz_id,
         'quiz_title': score.quiz.title,
@@ -98,7 +326,7 @@ def serialize_score(score):
         'total_questions': score.total_questions,
         'percentage': (score.total_scored / score.total_questions * 100) if score.total_questions > 0 else 0,
         'attempt_date': score.time_stamp_of_attempt.isoformat() if score.time_stamp_of_attempt else None
-    }
+    } for score in scores]
 
 def api_response(func):
     """Decorator for routes that can return either HTML or JSON"""
@@ -113,4 +341,48 @@ def api_response(func):
             return jsonify({'success': True}), 200
         return response
     
-    return wrapper 
\ No newline at end of file
+    return wrapper
+
+def catalog_version(*models):
+    """Row count and latest updated_at of each catalog model, fetched in one query"""
+    columns = []
+    for model in models:
+        columns.append(db.session.query(func.count(model.id)).scalar_subquery())
+        columns.append(db.session.query(func.max(model.updated_at)).scalar_subquery())
+    return tuple(db.session.query(*columns).one())
+
+def user_scores_version(user_id):
+    """Attempt count and newest score id of a user; scores are never edited, so this changes on every new attempt"""
+    return tuple(db.session.query(func.count(Score.id), func.max(Score.id)).filter(Score.user_id == user_id).one())
+
+def availability_version():
+    """The current UTC minute, for responses containing Quiz.is_available()"""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M')
+
+def conditional_json(version):
+    """
+    Decorator giving a route's JSON responses a strong ETag computed from version(**view_args),
+    which must cover everything the response depends on. A matching If-None-Match is answered
+    with 304 before the view runs, so nothing is loaded or serialized.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_json_requested():
+                return func(*args, **kwargs)
+
+            key = repr((request.path, sorted(request.args.items(multi=True)), session.get('user_id'), version(**kwargs)))
+            etag = hashlib.sha1(key.encode()).hexdigest()
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,50 @@
+"""
+Benchmark admin.api_subjects: per-subject count queries vs. one grouped join.
+
+Run from the repository root:
+
+    python -m benchmarks.api_subjects
+"""
+import time
+from app.models.models import db, Subject, Chapter, Quiz
+from benchmarks.common import make_app, seed_catalog, admin_client, QueryCounter
+
+SIZES = [10, 100, 1000]
+
+def legacy_counts():
+    """The original implementation: three queries per subject"""
+    subjects = Subject.query.all()
+    result = []
+    for subject in subjects:
+        chapter_count = Chapter.query.filter_by(subject_id=subject.id).count()
+        chapter_ids = [c.id for c in Chapter.query.filter_by(subject_id=subject.id).all()]
+        quiz_count = Quiz.query.filter(Quiz.chapter_id.in_(chapter_ids)).count() if chapter_ids else 0
+        result.append((subject.id, chapter_count, quiz_count))
+    return result
+
+def run():
+    print(f"{'subjects':>8} {'legacy queries':>15} {'legacy ms':>10} {'endpoint queries':>17} {'endpoint ms':>12}")
+    for size in SIZES:
+        app = make_app()
+        with app.app_context():
+            seed_catalog(size)
+            counter = QueryCounter(db.engine)
+
+            with counter.measure() as legacy:
+                start = time.perf_counter()
+                legacy_counts()
+                legacy['ms'] = (time.perf_counter() - start) * 1000
+            db.session.remove()
+
+        client = admin_client(app)
+        with app.app_context():
+            with counter.measure() as grouped:
+                start = time.perf_counter()
+                response = client.get('/admin/api/subjects')
+                grouped['ms'] = (time.perf_counter() - start) * 1000
+        assert response.status_code == 200 and response.json['count'] == size
+
+        print(f"{size:>8} {legacy['queries']:>15} {legacy['ms']:>10.1f} {grouped['queries']:>17} {grouped['ms']:>12.1f}")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from sqlalchemy import event, insert
+from app import create_app
+from app.models.models import db, Admin, User, Subject, Chapter, Quiz, Question
+
+def make_app(database_uri='sqlite://', **config):
+    """Create an app bound to a throwaway database with the schema created"""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'TESTING': True, **config})
+    with app.app_context():
+        db.create_all()
+    return app
+
+class QueryCounter:
+    """Count SQL statements executed on an engine"""
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    @contextmanager
+    def measure(self):
+        start = self.count
+        result = {}
+        yield result
+        result['queries'] = self.count - start
+
+def seed_catalog(subjects, chapters_per_subject=3, quizzes_per_chapter=3, questions_per_quiz=0):
+    """Bulk insert a Subject -> Chapter -> Quiz -> Question tree; call inside an app context"""
+    now = datetime.utcnow()
+    today = date.today()
+    db.session.execute(insert(Subject), [
+        {'id': s, 'name': f'Subject {s}', 'description': f'Description {s}', 'created_at': now}
+        for s in range(1, subjects + 1)
+    ])
+    chapter_rows = [
+        {'subject_id': s, 'name': f'Chapter {s}.{c}', 'description': '', 'created_at': now}
+        for s in range(1, subjects + 1) for c in range(chapters_per_subject)
+    ]
+    if chapter_rows:
+        db.session.execute(insert(Chapter), chapter_rows)
+    quiz_rows = [
+        {'chapter_id': c, 'title': f'Quiz {c}.{q}', 'date_of_quiz': today, 'time_duration': '23:59',
+         'remarks': '', 'created_at': now}
+        for c in range(1, len(chapter_rows) + 1) for q in range(quizzes_per_chapter)
+    ]
+    if quiz_rows:
+        db.session.execute(insert(Quiz), quiz_rows)
+    question_rows = [
+        {'quiz_id': q, 'question_statement': f'Question {q}.{n}', 'option1': 'A', 'option2': 'B',
+         'option3': 'C', 'option4': 'D', 'correct_option': n % 4 + 1}
+        for q in range(1, len(quiz_rows) + 1) for n in range(questions_per_quiz)
+    ]
+    if question_rows:
+        db.session.execute(insert(Question), question_rows)
+    db.session.commit()
+
+def seed_users(count, start=1):
+    """Bulk insert users with a placeholder password hash; call inside an app context"""
+    db.session.execute(insert(User), [
+        {'id': i, 'username': f'user{i}@example.com', 'password_hash': '-', 'full_name': f'User {i}',
+         'qualification': '', 'dob': date(2000, 1, 1)}
+        for i in range(start, start + count)
+    ])
+    db.session.commit()
+
+def admin_client(app):
+    """Return a test client whose session is logged in as an admin"""
+    client = app.test_client()
+    with app.app_context():
+        if not Admin.query.first():
+            admin = Admin(username='admin@quizmaster.com', password_hash='-')
+            db.session.add(admin)
+            db.session.commit()
+    with client.session_transaction() as session:
+        session['admin_id'] = 1
+        session['role'] = 'ADMIN'
+    return client
+
+def user_client(app, user_id=1):
+    """Return a test client whose session is logged in as the given user"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['role'] = 'USER'
+    return client
@@ -0,0 +1,80 @@
+"""
+Benchmark per-question correctness rates over one million answers: Response rows with and without
+ix_response_question_correct, and the vectorized scan of the same answers packed into Score.answers.
+
+Run from the repository root:
+
+    python -m benchmarks.item_analysis
+"""
+import random
+import time
+from datetime import datetime
+from sqlalchemy import Integer, func, insert, text
+from app.analytics import pack_answers, packed_correctness, row_correctness
+from app.cache import get_answer_key
+from app.models.models import db, Quiz, Score, Response
+from benchmarks.common import make_app, seed_catalog, seed_users
+
+USERS = 5000
+QUIZZES = 10
+QUESTIONS = 20
+
+def seed_answers():
+    """Record every attempt both ways: as Response rows and as a packed Score.answers blob"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    for quiz_id in range(1, QUIZZES + 1):
+        answer_key = get_answer_key(db.session.get(Quiz, quiz_id))
+        scores = []
+        rows = []
+        for user_id in range(1, USERS + 1):
+            score_id = (quiz_id - 1) * USERS + user_id
+            question_results = []
+            for question_id, correct_option in answer_key:
+                selected = rng.randint(1, 4)
+                question_results.append({'id': question_id, 'user_answer': selected,
+                                         'correct': selected == correct_option})
+                rows.append({'score_id': score_id, 'question_id': question_id, 'selected_option': selected,
+                             'is_correct': selected == correct_option})
+            scores.append({'id': score_id, 'quiz_id': quiz_id, 'user_id': user_id, 'time_stamp_of_attempt': now,
+                           'total_scored': 0, 'total_questions': QUESTIONS,
+                           'answers': pack_answers(answer_key, question_results), 'answers_version': 0})
+        db.session.execute(insert(Score), scores)
+        db.session.execute(insert(Response), rows)
+    db.session.commit()
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def all_questions():
+    query = db.session.query(Response.question_id, func.count(), func.sum(Response.is_correct, type_=Integer))
+    return query.group_by(Response.question_id).all()
+
+def run():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(1, chapters_per_subject=1, quizzes_per_chapter=QUIZZES, questions_per_quiz=QUESTIONS)
+        seed_users(USERS)
+        seed_answers()
+        total = db.session.query(func.count()).select_from(Response).scalar()
+        print(f'{total} answers')
+
+        quizzes = [(quiz, get_answer_key(quiz)) for quiz in Quiz.query.order_by(Quiz.id)]
+        quiz, answer_key = quizzes[0]
+        assert row_correctness(quiz.id) == packed_correctness(quiz, answer_key)
+
+        print(f"{'storage':>16} {'one quiz ms':>12} {'all questions ms':>17}")
+        indexed = (timed(lambda: row_correctness(1)), timed(all_questions))
+        packed = (timed(lambda: packed_correctness(quiz, answer_key)),
+                  timed(lambda: [packed_correctness(quiz, answer_key) for quiz, answer_key in quizzes]))
+        db.session.execute(text('DROP INDEX ix_response_question_correct'))
+        unindexed = (timed(lambda: row_correctness(1)), timed(all_questions))
+        print(f"{'rows, indexed':>16} {indexed[0]:>12.1f} {indexed[1]:>17.1f}")
+        print(f"{'rows, no index':>16} {unindexed[0]:>12.1f} {unindexed[1]:>17.1f}")
+        print(f"{'packed':>16} {packed[0]:>12.1f} {packed[1]:>17.1f}")
+
+if __name__ == '__main__':
+    run()
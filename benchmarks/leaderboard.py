@@ -0,0 +1,59 @@
+"""
+Benchmark quiz rank lookups over 100k attempts: sorting every Score vs. the QuizStats histogram,
+and the top-10 read from ix_score_quiz_standing.
+
+Run from the repository root:
+
+    python -m benchmarks.leaderboard
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models.models import db, Score
+from app.stats import rebuild_quiz_stats, user_standing, leaderboard
+from benchmarks.common import make_app, seed_catalog, seed_users
+
+ATTEMPTS = 100_000
+QUESTIONS = 50
+
+def timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # Each lookup reads its QuizStats row again, as a new request would
+        db.session.expire_all()
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def sorted_rank(score):
+    """Rank by ordering every attempt at the quiz"""
+    ordered = Score.query.filter_by(quiz_id=score.quiz_id).order_by(Score.total_scored.desc()).all()
+    for position, other in enumerate(ordered):
+        if other.total_scored == score.total_scored:
+            return position + 1
+
+def run():
+    app = make_app()
+    with app.app_context():
+        seed_catalog(1, chapters_per_subject=1, quizzes_per_chapter=1, questions_per_quiz=QUESTIONS)
+        seed_users(ATTEMPTS)
+        rng = random.Random(11)
+        start = datetime.utcnow()
+        db.session.execute(insert(Score), [
+            {'quiz_id': 1, 'user_id': user_id, 'time_stamp_of_attempt': start + timedelta(seconds=user_id),
+             'total_scored': min(max(int(rng.gauss(30, 8)), 0), QUESTIONS), 'total_questions': QUESTIONS}
+            for user_id in range(1, ATTEMPTS + 1)
+        ])
+        db.session.commit()
+        rebuild_quiz_stats()
+
+        score = db.session.get(Score, ATTEMPTS // 2)
+        assert sorted_rank(score) == user_standing(score)['rank']
+
+        print(f"{'lookup':>22} {'ms':>8}")
+        print(f"{'rank, ORDER BY all':>22} {timed(lambda: sorted_rank(score), 3):>8.2f}")
+        print(f"{'rank, histogram':>22} {timed(lambda: user_standing(score)):>8.2f}")
+        print(f"{'top 10, index':>22} {timed(lambda: leaderboard(1)):>8.2f}")
+
+if __name__ == '__main__':
+    run()
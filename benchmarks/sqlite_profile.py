@@ -0,0 +1,83 @@
+"""
+Benchmark concurrent reads and writes under the default SQLite settings and the production profile.
+
+Reader threads run the user score lookups behind the dashboard while writer threads record quiz
+attempts, all against one file-backed database for a fixed time. Run from the repository root:
+
+    python -m benchmarks.sqlite_profile
+"""
+import itertools
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from app.config import production_config
+from app.models.models import db, Score
+from app.submissions import submit_target, record_score
+from benchmarks.common import make_app, seed_catalog, seed_users
+
+USERS = 5000
+QUIZZES = 50
+READERS = 16
+WRITERS = 4
+SECONDS = 5
+# Attempts are recorded without per-question answers, so the key only sets total_questions
+ANSWER_KEY = tuple((question_id, 1) for question_id in range(1, 11))
+
+def run_mix(app):
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + SECONDS
+    attempts = itertools.product(range(1, QUIZZES + 1), range(1, USERS + 1))
+    attempts_lock = threading.Lock()
+
+    def reader(seed):
+        user_ids = itertools.cycle(range(seed, USERS + 1, READERS))
+        while time.monotonic() < stop:
+            with app.app_context():
+                try:
+                    Score.query.filter_by(user_id=next(user_ids)).order_by(Score.time_stamp_of_attempt.desc()).all()
+                    outcome = 'reads'
+                except OperationalError:
+                    outcome = 'errors'
+            with lock:
+                counts[outcome] += 1
+
+    def writer():
+        while time.monotonic() < stop:
+            with attempts_lock:
+                quiz_id, user_id = next(attempts)
+            with app.app_context():
+                try:
+                    record_score(user_id, submit_target(quiz_id), ANSWER_KEY, 1)
+                    outcome = 'writes'
+                except OperationalError:
+                    db.session.rollback()
+                    outcome = 'errors'
+            with lock:
+                counts[outcome] += 1
+
+    threads = [threading.Thread(target=reader, args=(n + 1,)) for n in range(READERS)]
+    threads += [threading.Thread(target=writer) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {name: count / SECONDS for name, count in counts.items()}
+
+def run():
+    print(f"{'profile':>11} {'reads/s':>9} {'writes/s':>9} {'errors/s':>9}")
+    for name in ('default', 'production'):
+        with tempfile.TemporaryDirectory() as directory:
+            uri = 'sqlite:///' + os.path.join(directory, 'bench.db')
+            config = production_config({'DATABASE_URL': uri}) if name == 'production' else {'SQLALCHEMY_DATABASE_URI': uri}
+            app = make_app(**config)
+            with app.app_context():
+                seed_catalog(1, chapters_per_subject=1, quizzes_per_chapter=QUIZZES)
+                seed_users(USERS)
+            rates = run_mix(app)
+        print(f"{name:>11} {rates['reads']:>9.0f} {rates['writes']:>9.0f} {rates['errors']:>9.1f}")
+
+if __name__ == '__main__':
+    run()
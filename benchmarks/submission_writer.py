@@ -0,0 +1,48 @@
+"""
+Benchmark a burst of concurrent quiz submissions with and without the group-commit SubmissionWriter.
+
+Every user submits the same quiz at once from a pool of threads, as when a timed quiz window closes.
+Run from the repository root:
+
+    python -m benchmarks.submission_writer
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.models.models import db, Score
+from benchmarks.common import make_app, seed_catalog, seed_users
+from benchmarks.submit import fast_submit
+
+USERS = 2000
+THREADS = [8, 32]
+
+def burst(app, threads):
+    def submit(user_id):
+        with app.app_context():
+            return fast_submit(user_id, 1)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        score_ids = list(pool.map(submit, range(1, USERS + 1)))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        assert len(set(score_ids)) == USERS and db.session.query(Score).count() == USERS
+    return USERS / elapsed
+
+def run():
+    print(f"{'threads':>8} {'per-request commit/s':>21} {'group commit/s':>15}")
+    for threads in THREADS:
+        rates = []
+        for writer in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                app = make_app('sqlite:///' + os.path.join(directory, 'bench.db'), SUBMISSION_WRITER=writer)
+                with app.app_context():
+                    seed_catalog(1, chapters_per_subject=1, quizzes_per_chapter=1, questions_per_quiz=20)
+                    seed_users(USERS)
+                rates.append(burst(app, threads))
+        print(f"{threads:>8} {rates[0]:>21.0f} {rates[1]:>15.0f}")
+
+if __name__ == '__main__':
+    run()
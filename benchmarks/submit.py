@@ -0,0 +1,81 @@
+"""
+Benchmark quiz submission: the original read-then-write submit vs. the single-transaction path.
+
+Both sides run against a file-backed SQLite database so commits cost what they do in production.
+Run from the repository root:
+
+    python -m benchmarks.submit
+"""
+import os
+import tempfile
+import time
+from datetime import datetime
+from app.models.models import db, Quiz, Question, Score
+from app.cache import get_answer_key
+from app.submissions import submit_target, record_score
+from app.utils import grade_answers
+from benchmarks.common import make_app, seed_catalog, seed_users, user_client, QueryCounter
+
+USERS = 2000
+QUESTIONS = 20
+ANSWERS = {str(n): (n % 3) + 1 for n in range(1, QUESTIONS + 1)}
+
+def legacy_submit(user_id, quiz_id):
+    """The original implementation: quiz, duplicate check and Question rows read before the ORM insert"""
+    quiz = Quiz.query.get_or_404(quiz_id)
+    if Score.query.filter_by(user_id=user_id, quiz_id=quiz_id).first():
+        return None
+    questions = Question.query.filter_by(quiz_id=quiz.id).all()
+    score = sum(1 for q in questions if ANSWERS.get(str(q.id)) == q.correct_option)
+    new_score = Score(quiz_id=quiz_id, user_id=user_id, time_stamp_of_attempt=datetime.utcnow(),
+                      total_scored=score, total_questions=len(questions))
+    db.session.add(new_score)
+    db.session.commit()
+    return new_score.id
+
+def fast_submit(user_id, quiz_id):
+    quiz = submit_target(quiz_id)
+    answer_key = get_answer_key(quiz)
+    score, _, question_results = grade_answers(answer_key, lambda question_id: ANSWERS.get(str(question_id)))
+    return record_score(user_id, quiz, answer_key, score, question_results)
+
+def measure(app, submit, quiz_id):
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        with counter.measure() as result:
+            start = time.perf_counter()
+            for user_id in range(1, USERS + 1):
+                submit(user_id, quiz_id)
+                db.session.remove()
+            elapsed = time.perf_counter() - start
+        # A repeat attempt must be refused, not recorded twice
+        assert submit(1, quiz_id) is None
+        db.session.remove()
+    return USERS / elapsed, result['queries'] / USERS
+
+def measure_endpoint(app, quiz_id):
+    clients = [user_client(app, user_id) for user_id in range(1, USERS + 1)]
+    start = time.perf_counter()
+    for client in clients:
+        response = client.post(f'/user/quizzes/{quiz_id}/submit', json={'answers': ANSWERS})
+        assert response.status_code == 200, response.status_code
+    return USERS / (time.perf_counter() - start)
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app('sqlite:///' + os.path.join(directory, 'bench.db'))
+        with app.app_context():
+            seed_catalog(1, chapters_per_subject=1, quizzes_per_chapter=3, questions_per_quiz=QUESTIONS)
+            seed_users(USERS)
+
+        legacy_rate, legacy_queries = measure(app, legacy_submit, 1)
+        fast_rate, fast_queries = measure(app, fast_submit, 2)
+        endpoint_rate = measure_endpoint(app, 3)
+
+    print(f"{'path':>10} {'submits/s':>10} {'queries/submit':>15}")
+    print(f"{'legacy':>10} {legacy_rate:>10.0f} {legacy_queries:>15.1f}")
+    print(f"{'fast':>10} {fast_rate:>10.0f} {fast_queries:>15.1f}")
+    print(f"{'endpoint':>10} {endpoint_rate:>10.0f}")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,59 @@
+"""
+Benchmark admin.api_suggest against 100k users: indexed prefix range vs. sorted ILIKE scan.
+
+Run from the repository root:
+
+    python -m benchmarks.suggest
+"""
+import random
+import statistics
+import time
+from datetime import date
+from sqlalchemy import insert, text
+from app.models.models import db, User
+from app.search import suggest
+from benchmarks.common import make_app, admin_client
+
+USERS = 100_000
+PREFIXES = ['a', 'ma', 'jo', 'sam', 'kri', 'zz', 'priya s']
+FIRST_NAMES = ['Aarav', 'Maria', 'John', 'Joanna', 'Samuel', 'Samira', 'Krishna', 'Kristen', 'Priya', 'Zoe']
+LAST_NAMES = ['Sharma', 'Smith', 'Garcia', 'Nguyen', 'Okafor', 'Rossi', 'Tanaka', 'Silva']
+
+def seed_named_users(count):
+    rng = random.Random(42)
+    db.session.execute(insert(User), [
+        {'id': i, 'username': f'user{i}@example.com', 'password_hash': '-',
+         'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}',
+         'qualification': '', 'dob': date(2000, 1, 1)}
+        for i in range(1, count + 1)
+    ])
+    db.session.commit()
+
+def timed(fn, repeat=50):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+def run():
+    app = make_app()
+    with app.app_context():
+        seed_named_users(USERS)
+        plan = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM user WHERE lower(full_name) >= 'ma' AND lower(full_name) < 'mb' "
+            "ORDER BY lower(full_name), id LIMIT 10")).all()
+        print('plan:', '; '.join(row[-1] for row in plan))
+
+    client = admin_client(app)
+    print(f"{'prefix':>8} {'ilike p50 ms':>13} {'suggest p50 ms':>15} {'suggest max ms':>15} {'endpoint p50 ms':>16}")
+    for prefix in PREFIXES:
+        with app.app_context():
+            ilike_p50, _ = timed(lambda: User.query.filter(User.full_name.ilike(f'{prefix}%')).order_by(User.full_name).limit(10).all(), 5)
+            suggest_p50, suggest_max = timed(lambda: suggest('users', prefix, 10))
+        endpoint_p50, _ = timed(lambda: client.get('/admin/api/suggest', query_string={'q': prefix, 'type': 'users'}))
+        print(f"{prefix!r:>8} {ilike_p50:>13.2f} {suggest_p50:>15.2f} {suggest_max:>15.2f} {endpoint_p50:>16.2f}")
+
+if __name__ == '__main__':
+    run()
@@ -1,5 +1,52 @@
 from app import create_app
-from app.models.models import db, Admin, User, Subject, Chapter, Quiz
+from app.models.models import db, Admin, User, Subject, Chapter, Quiz, Score, QuizStats
+from app.utils import repair_counts
+from app.search import ensure_search_index
+from app.stats import rebuild_quiz_stats
+from sqlalchemy import func, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+def upgrade_database():
+    """
+    Bring an existing database up to the current schema without rebuilding it.
+    Safe to run repeatedly; only missing columns and indexes are created.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                db.session.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column_ddl}'))
+                print(f"Added column {table.name}.{column.name}")
+    db.session.commit()
+
+    for model in (Subject, Chapter, Quiz):
+        model.query.filter(model.updated_at.is_(None)).update({model.updated_at: model.created_at})
+    repair_counts()
+
+    query = db.session.query(Score.user_id, Score.quiz_id).group_by(Score.user_id, Score.quiz_id)
+    duplicate_scores = query.having(func.count(Score.id) > 1).count()
+
+    # The inspector skips expression indexes such as lower(name), so look names up directly
+    existing_indexes = {name for (name,) in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            if index.unique and table.name == Score.__tablename__ and duplicate_scores:
+                print(f"Skipping {index.name}: {duplicate_scores} user/quiz pairs have more than one score. "
+                      "Remove the duplicate attempts and run this script again.")
+                continue
+            index.create(bind=db.engine)
+
+    ensure_search_index()
+
+    # Scores recorded before QuizStats existed
+    if not QuizStats.query.first() and Score.query.first():
+        rebuild_quiz_stats()
+
+    print("Database schema is up to date.")
 
 def setup_database():
     """
@@ -10,6 +57,7 @@ def setup_database():
     with app.app_context():
         
         db.create_all()
+        upgrade_database()
         
        
         admin_exists = Admin.query.filter_by(username='admin@quizmaster.com').first()
@@ -0,0 +1,26 @@
+from app.models.models import db, Subject
+from benchmarks.common import make_app, seed_catalog, seed_users, user_client
+
+
+def test_failed_subrequest_does_not_poison_the_rest_of_the_batch():
+    app = make_app()
+
+    def duplicate_subject():
+        # Leaves the shared session needing a rollback, as any failed flush does
+        db.session.add(Subject(id=1, name='Duplicate', description=''))
+        db.session.flush()
+
+    app.add_url_rule('/user/duplicate-subject', view_func=duplicate_subject)
+    with app.app_context():
+        seed_catalog(1)
+        seed_users(1)
+
+    response = user_client(app).post('/api/batch', json={
+        'requests': ['/user/duplicate-subject', '/user/catalog?depth=1']
+    })
+
+    assert response.status_code == 200
+    failed, succeeded = response.get_json()['responses']
+    assert failed['status'] == 500
+    assert succeeded['status'] == 200
+    assert [subject['name'] for subject in succeeded['body']['subjects']] == ['Subject 1']